@@ -0,0 +1,94 @@
+import os
+import hashlib
+from importlib import import_module
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.contrib.sessions.models import Session
+from django.utils import timezone
+from .models import User
+
+# session_id -> 사용자 캐시 유지 시간 (초). 세션 만료 시각을 넘지는 않는다.
+SESSION_USER_CACHE_TTL = int(os.getenv("SESSION_USER_CACHE_TTL", 300))
+DB_SESSION_ENGINE = "django.contrib.sessions.backends.db"
+# locmem/dummy 캐시는 워커(프로세스)마다 따로라 로그아웃 시 다른 워커의 캐시를 지울 수 없다.
+# 이 경우 세션 -> 사용자 캐시를 쓰지 않고 매 요청 세션 저장소를 확인한다.
+PER_PROCESS_CACHES = ("django.core.cache.backends.locmem.LocMemCache", "django.core.cache.backends.dummy.DummyCache")
+SESSION_USER_CACHE = settings.CACHES["default"]["BACKEND"] not in PER_PROCESS_CACHES
+
+
+class InvalidSession(Exception):
+    """세션이 없거나 만료되었거나 user_id 가 없는 경우"""
+
+
+def session_user_key(session_id):
+    # 세션 키를 그대로 캐시 키에 노출하지 않는다
+    return f"accounts:session_user:{hashlib.sha256(session_id.encode()).hexdigest()}"
+
+
+def session_store(session_id=None):
+    return import_module(settings.SESSION_ENGINE).SessionStore(session_key=session_id)
+
+
+def load_session(session_id):
+    """세션 엔진에서 (user_id, 남은 유효 시간 초)를 읽는다."""
+    if settings.SESSION_ENGINE == DB_SESSION_ENGINE:
+        now = timezone.now()
+        row = Session.objects.filter(
+            session_key=session_id, expire_date__gt=now
+        ).values_list("session_data", "expire_date").first()
+        if row is None:
+            raise InvalidSession(session_id)
+        session_data, expire_date = row
+        data = session_store().decode(session_data)
+        remaining = (expire_date - now).total_seconds()
+    else:
+        # cache / cached_db 엔진은 만료된 세션을 스스로 버린다
+        store = session_store(session_id)
+        data = store.load()
+        remaining = store.get_expiry_age()
+    user_id = data.get("user_id")
+    if user_id is None:
+        raise InvalidSession(session_id)
+    return user_id, remaining
+
+
+def get_session_user(session_id):
+    """
+    session_id 로 사용자를 조회한다.
+    공유 캐시 백엔드를 쓰면 결과를 캐시에 보관하므로 같은 세션의 다음 요청은 DB 를 조회하지 않는다.
+    반환되는 User 는 id/username 만 채워져 있다 (다른 필드는 접근할 때 조회).
+    """
+    if not session_id:
+        raise InvalidSession(session_id)
+    if not SESSION_USER_CACHE:
+        user_id, _ = load_session(session_id)
+        return User.objects.only("id", "username").get(id=user_id)
+    key = session_user_key(session_id)
+    cached = cache.get(key)
+    if cached is None:
+        user_id, remaining = load_session(session_id)
+        user = User.objects.only("id", "username").get(id=user_id)
+        cached = (user.id, user.username)
+        timeout = min(SESSION_USER_CACHE_TTL, int(remaining))
+        if timeout > 0:
+            cache.set(key, cached, timeout=timeout)
+    return User.from_db("default", ["id", "username"], cached)
+
+
+async def aget_session_user(session_id):
+    """get_session_user 의 비동기 버전 (캐시 적중 시 스레드 전환 없음)"""
+    if not session_id:
+        raise InvalidSession(session_id)
+    if not SESSION_USER_CACHE:
+        return await sync_to_async(get_session_user)(session_id)
+    cached = await cache.aget(session_user_key(session_id))
+    if cached is not None:
+        return User.from_db("default", ["id", "username"], cached)
+    return await sync_to_async(get_session_user)(session_id)
+
+
+def invalidate_session(session_id):
+    """로그아웃 등으로 세션이 끝났을 때 캐시된 사용자 정보를 지운다."""
+    if SESSION_USER_CACHE:
+        cache.delete(session_user_key(session_id))
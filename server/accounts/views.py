@@ -1,8 +1,8 @@
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.contrib.auth.hashers import make_password, check_password
-from django.contrib.sessions.backends.db import SessionStore
 import json
+from .auth import invalidate_session, session_store
 from .models import User
 
 @csrf_exempt
@@ -43,7 +43,7 @@ def login(request):
                 return JsonResponse({"error": "존재하지 않는 사용자입니다."}, status=401)
 
             if check_password(password, user.password):
-                session = SessionStore()
+                session = session_store()
                 session['user_id'] = user.id
                 session.create()
                 return JsonResponse({"message": "로그인 성공", "session_id": session.session_key}, status=200)
@@ -51,3 +51,20 @@ def login(request):
                 return JsonResponse({"error": "비밀번호가 잘못되었습니다."}, status=401)
         except Exception as e:
             return JsonResponse({"error": str(e)}, status=500)
+
+@csrf_exempt
+def logout(request):
+    if request.method == 'POST':
+        try:
+            data = json.loads(request.body)
+            session_id = data.get('session_id')
+
+            if not session_id:
+                return JsonResponse({"error": "세션 ID를 입력해주세요."}, status=400)
+
+            # 세션 삭제 후 캐시된 사용자 정보도 함께 삭제
+            session_store().delete(session_id)
+            invalidate_session(session_id)
+            return JsonResponse({"message": "로그아웃 성공"}, status=200)
+        except Exception as e:
+            return JsonResponse({"error": str(e)}, status=500)
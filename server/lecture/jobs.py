@@ -0,0 +1,105 @@
+import os
+import socket
+import logging
+from datetime import timedelta
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from .models import LectureJob
+
+# 이 시간 동안 진행 상황이 갱신되지 않은 running 작업은 워커가 죽은 것으로 보고 다시 큐에 넣는다
+LECTURE_JOB_STALE_SECONDS = int(os.getenv("LECTURE_JOB_STALE_SECONDS", 3600))
+LECTURE_JOB_MAX_ATTEMPTS = int(os.getenv("LECTURE_JOB_MAX_ATTEMPTS", 3))
+
+ACTIVE_STATUSES = (LectureJob.STATUS_QUEUED, LectureJob.STATUS_RUNNING)
+
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def enqueue(unique_name, video_url=None, upload_path=None):
+    """
+    강의 작업을 큐에 넣는다. 같은 unique_name 의 작업이 이미 진행 중이면 그 작업을 반환한다.
+    반환값: (job, created) — created 가 False 면 기존 작업에 붙은 것
+    """
+    try:
+        with transaction.atomic():
+            job = LectureJob.objects.create(unique_name=unique_name, video_url=video_url, upload_path=upload_path)
+        return job, True
+    except IntegrityError:
+        job = LectureJob.objects.get(unique_name=unique_name)
+
+    # 실패했던 작업은 새 입력으로 다시 큐에 넣는다
+    requeued = LectureJob.objects.filter(id=job.id, status=LectureJob.STATUS_FAILED).update(
+        status=LectureJob.STATUS_QUEUED, stage=LectureJob.STATUS_QUEUED, error=None,
+        video_url=video_url, upload_path=upload_path, attempts=0, worker=None,
+        started_at=None, finished_at=None, updated_at=timezone.now(),
+    )
+    job.refresh_from_db()
+    return job, bool(requeued)
+
+
+def requeue_stale():
+    """진행이 멈춘 running 작업을 다시 queued 로 돌린다 (재시도 횟수를 넘으면 실패 처리)"""
+    cutoff = timezone.now() - timedelta(seconds=LECTURE_JOB_STALE_SECONDS)
+    stale = LectureJob.objects.filter(status=LectureJob.STATUS_RUNNING, updated_at__lt=cutoff)
+    stale.filter(attempts__gte=LECTURE_JOB_MAX_ATTEMPTS).update(
+        status=LectureJob.STATUS_FAILED, error="worker stopped responding", finished_at=timezone.now()
+    )
+    return stale.update(status=LectureJob.STATUS_QUEUED, worker=None, updated_at=timezone.now())
+
+
+def claim_next(worker):
+    """
+    가장 오래된 queued 작업 하나를 가져온다.
+    조건부 UPDATE 로 선점하므로 여러 워커 프로세스가 동시에 돌아도 같은 작업을 중복 처리하지 않는다.
+    """
+    while True:
+        job_id = (LectureJob.objects.filter(status=LectureJob.STATUS_QUEUED)
+                  .order_by("created_at").values_list("id", flat=True).first())
+        if job_id is None:
+            return None
+        claimed = LectureJob.objects.filter(id=job_id, status=LectureJob.STATUS_QUEUED).update(
+            status=LectureJob.STATUS_RUNNING, worker=worker, attempts=F("attempts") + 1,
+            started_at=timezone.now(), updated_at=timezone.now(),
+        )
+        if claimed:
+            return LectureJob.objects.get(id=job_id)
+
+
+def set_stage(job, stage):
+    job.stage = stage
+    LectureJob.objects.filter(id=job.id).update(stage=stage, updated_at=timezone.now())
+    logging.info(f"강의 작업 {job.id} ({job.unique_name}): {stage}")
+
+
+def finish(job):
+    LectureJob.objects.filter(id=job.id).update(
+        status=LectureJob.STATUS_DONE, stage=LectureJob.STATUS_DONE, error=None,
+        finished_at=timezone.now(), updated_at=timezone.now(),
+    )
+
+
+def fail(job, error):
+    LectureJob.objects.filter(id=job.id).update(
+        status=LectureJob.STATUS_FAILED, error=str(error),
+        finished_at=timezone.now(), updated_at=timezone.now(),
+    )
+
+
+def job_status(job, summary=None):
+    data = {
+        "job_id": str(job.id),
+        "unique_name": job.unique_name,
+        "status": job.status,
+        "stage": job.stage,
+        "attempts": job.attempts,
+        "created_at": job.created_at.isoformat(),
+        "updated_at": job.updated_at.isoformat(),
+    }
+    if job.error:
+        data["error"] = job.error
+    if summary is not None:
+        data["summary"] = summary
+    return data
@@ -0,0 +1,55 @@
+import time
+import signal
+import logging
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from lecture import jobs
+from lecture.views import process_lecture_job
+
+
+class Command(BaseCommand):
+    help = "큐에 들어온 강의 요약 작업을 처리합니다. 여러 프로세스로 실행하면 작업을 나눠 처리합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--poll-interval", type=float, default=2.0, help="큐가 비었을 때 대기 시간(초)")
+        parser.add_argument("--once", action="store_true", help="큐에 있는 작업을 모두 처리한 뒤 종료")
+
+    def handle(self, *args, **options):
+        worker = jobs.worker_name()
+        stopping = False
+
+        def stop(signum, frame):
+            # 진행 중인 작업은 끝까지 처리하고 종료
+            nonlocal stopping
+            stopping = True
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+        self.stdout.write(f"강의 작업 워커 시작: {worker}")
+
+        while not stopping:
+            close_old_connections()
+            requeued = jobs.requeue_stale()
+            if requeued:
+                logging.warning(f"멈춘 강의 작업 {requeued}개를 다시 큐에 넣었습니다.")
+
+            job = jobs.claim_next(worker)
+            if job is None:
+                if options["once"]:
+                    break
+                time.sleep(options["poll_interval"])
+                continue
+
+            started = time.perf_counter()
+            try:
+                process_lecture_job(job)
+                jobs.finish(job)
+                self.stdout.write(self.style.SUCCESS(
+                    f"{job.unique_name} 완료 ({time.perf_counter() - started:.1f}초)"
+                ))
+            except Exception as e:
+                logging.exception(f"강의 작업 실패: {job.unique_name}")
+                jobs.fail(job, e)
+                self.stdout.write(self.style.ERROR(f"{job.unique_name} 실패 ({job.stage}): {e}"))
+
+        self.stdout.write(f"강의 작업 워커 종료: {worker}")
@@ -0,0 +1,111 @@
+import os
+import re
+import json
+import hashlib
+from urllib.parse import urlsplit, urlunsplit, parse_qs, parse_qsl, urlencode
+from django.conf import settings
+
+# 추출한 음성과 STT 결과를 보관하는 디렉토리 (강의 요약 행과 관계없이 재사용)
+LECTURE_CACHE_DIR = os.getenv("LECTURE_CACHE_DIR", os.path.join(settings.BASE_DIR, "data/cache/lecture"))
+UPLOAD_DIR = os.path.join(LECTURE_CACHE_DIR, "uploads")
+AUDIO_DIR = os.path.join(LECTURE_CACHE_DIR, "audio")
+TRANSCRIPT_DIR = os.path.join(LECTURE_CACHE_DIR, "transcripts")
+
+YOUTUBE_HOSTS = {"youtube.com", "youtube-nocookie.com"}
+YOUTUBE_PATH_PREFIXES = {"shorts", "embed", "live", "v"}
+YOUTUBE_ID = re.compile(r"^[A-Za-z0-9_-]{11}$")
+# 같은 영상을 가리키는 URL 에서 달라질 수 있는 파라미터
+IGNORED_PARAMS = {"t", "start", "si", "feature", "list", "index", "pp", "fbclid", "gclid"}
+
+
+def sha256_hex(data):
+    return hashlib.sha256(data.encode("utf-8") if isinstance(data, str) else data).hexdigest()
+
+
+def file_sha256(path, block_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def youtube_id(parsed):
+    host = (parsed.hostname or "").lower()
+    for prefix in ("www.", "m.", "music."):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+    if host == "youtu.be":
+        return parsed.path.strip("/").split("/")[0]
+    if host in YOUTUBE_HOSTS:
+        if parsed.path.rstrip("/") == "/watch":
+            return parse_qs(parsed.query).get("v", [None])[0]
+        parts = parsed.path.strip("/").split("/")
+        if len(parts) >= 2 and parts[0] in YOUTUBE_PATH_PREFIXES:
+            return parts[1]
+    return None
+
+
+def canonical_video_key(video_url):
+    """
+    영상 URL 의 정규 키.
+    YouTube 는 형식(youtu.be, shorts, &t=, 재생목록 파라미터 등)과 관계없이 "youtube:<영상 ID>",
+    그 밖의 URL 은 fragment 와 추적 파라미터를 뺀 URL 의 해시 "url:<sha256>".
+    """
+    url = video_url.strip()
+    parsed = urlsplit(url if "://" in url else f"https://{url}")
+    video_id = youtube_id(parsed)
+    if video_id and YOUTUBE_ID.match(video_id):
+        return f"youtube:{video_id}"
+
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parsed.query, keep_blank_values=True)
+        if key not in IGNORED_PARAMS and not key.startswith("utm_")
+    ))
+    normalized = urlunsplit((parsed.scheme.lower(), parsed.netloc.lower(), parsed.path or "/", query, ""))
+    return f"url:{sha256_hex(normalized)}"
+
+
+def save_upload(video_file):
+    """
+    업로드 파일을 내용 해시 이름으로 저장한다. 파일 이름이 달라도 내용이 같으면 같은 키가 된다.
+    반환값: ("sha256:<hex>", 저장 경로)
+    """
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    ext = os.path.splitext(video_file.name)[-1].lower()
+    tmp_path = os.path.join(UPLOAD_DIR, f".{os.getpid()}-{id(video_file)}{ext}.tmp")
+    digest = hashlib.sha256()
+    with open(tmp_path, "wb") as out_file:
+        for chunk in video_file.chunks():
+            digest.update(chunk)
+            out_file.write(chunk)
+    path = os.path.join(UPLOAD_DIR, f"{digest.hexdigest()}{ext}")
+    os.replace(tmp_path, path)
+    return f"sha256:{digest.hexdigest()}", path
+
+
+def cached_audio_path(source_key):
+    """정규 키별로 추출한 16kHz 모노 WAV 경로"""
+    return os.path.join(AUDIO_DIR, f"{sha256_hex(source_key)}.wav")
+
+
+def transcript_path(audio_hash):
+    return os.path.join(TRANSCRIPT_DIR, audio_hash[:2], f"{audio_hash}.json")
+
+
+def load_transcript(audio_hash):
+    """음성 파일 해시로 저장된 STT 결과 ({"text", "segments"})"""
+    try:
+        with open(transcript_path(audio_hash), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def save_transcript(audio_hash, transcript):
+    path = transcript_path(audio_hash)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(transcript, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
@@ -0,0 +1,35 @@
+# Generated by Django 5.1.3 on 2026-10-18 19:33
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lecture', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LectureJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('unique_name', models.CharField(max_length=100, unique=True)),
+                ('video_url', models.TextField(blank=True, null=True)),
+                ('upload_path', models.CharField(blank=True, max_length=255, null=True)),
+                ('status', models.CharField(choices=[('queued', 'queued'), ('running', 'running'), ('done', 'done'), ('failed', 'failed')], default='queued', max_length=20)),
+                ('stage', models.CharField(default='queued', max_length=30)),
+                ('error', models.TextField(blank=True, null=True)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('worker', models.CharField(blank=True, max_length=100, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'created_at'], name='lecture_job_status_idx')],
+            },
+        ),
+    ]
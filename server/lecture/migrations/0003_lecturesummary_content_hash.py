@@ -0,0 +1,18 @@
+# Generated by Django 5.1.3 on 2026-10-18 19:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lecture', '0002_lecturejob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lecturesummary',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, max_length=64, null=True),
+        ),
+    ]
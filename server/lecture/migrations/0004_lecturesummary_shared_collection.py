@@ -0,0 +1,18 @@
+# Generated by Django 5.1.3 on 2026-10-18 19:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lecture', '0003_lecturesummary_content_hash'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='lecturesummary',
+            name='collection_name',
+            field=models.CharField(blank=True, db_index=True, max_length=100, null=True),
+        ),
+    ]
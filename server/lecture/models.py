@@ -1,11 +1,52 @@
+import uuid
 from django.db import models
 
 class LectureSummary(models.Model):
     unique_name = models.CharField(max_length=100, unique=True)
-    collection_name = models.CharField(max_length=100, unique=True, null=True, blank=True)
+    # 같은 내용(content_hash)의 강의는 컬렉션을 함께 쓴다
+    collection_name = models.CharField(max_length=100, db_index=True, null=True, blank=True)
     db_path = models.CharField(max_length=255, null=True, blank=True)
     summary = models.TextField(blank=True, null=True)
+    # 추출한 음성의 sha256 (다른 URL/업로드로 들어온 같은 강의의 요약 재사용)
+    content_hash = models.CharField(max_length=64, blank=True, null=True, db_index=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
         return self.unique_name
+
+
+class LectureJob(models.Model):
+    """강의 다운로드/변환/STT/임베딩/요약을 백그라운드 워커가 처리하는 작업"""
+    STATUS_QUEUED = "queued"
+    STATUS_RUNNING = "running"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, "queued"),
+        (STATUS_RUNNING, "running"),
+        (STATUS_DONE, "done"),
+        (STATUS_FAILED, "failed"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    # 같은 강의는 하나의 작업에 붙는다 (실패한 작업은 다시 요청하면 재사용)
+    unique_name = models.CharField(max_length=100, unique=True)
+    video_url = models.TextField(blank=True, null=True)
+    upload_path = models.CharField(max_length=255, blank=True, null=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    stage = models.CharField(max_length=30, default=STATUS_QUEUED)
+    error = models.TextField(blank=True, null=True)
+    attempts = models.PositiveIntegerField(default=0)
+    worker = models.CharField(max_length=100, blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='lecture_job_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.unique_name} ({self.status}/{self.stage})"
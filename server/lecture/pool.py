@@ -0,0 +1,157 @@
+import os
+import time
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager, asynccontextmanager
+
+POOL_MAX_SIZE = int(os.getenv("LECTURE_POOL_MAX_SIZE", 16))
+POOL_MAX_IDLE = float(os.getenv("LECTURE_POOL_MAX_IDLE", 600))  # 초
+
+
+def close_chroma(db):
+    """Chroma 핸들이 잡고 있는 SQLite/HNSW 리소스를 해제 (best-effort)"""
+    client = getattr(db, "_client", None)
+    system = getattr(client, "_system", None)
+    if system is None:
+        return
+    try:
+        # 같은 경로로 다시 열 때 멈춘 시스템을 재사용하지 않도록 공유 캐시에서도 제거
+        identifier = getattr(client, "_identifier", None)
+        shared = getattr(type(client), "_identifier_to_system", None)
+        if shared is not None and identifier is not None:
+            shared.pop(identifier, None)
+        system.stop()
+    except Exception as e:
+        logging.warning(f"Chroma 핸들 해제 실패: {e}")
+
+
+class _Entry:
+    def __init__(self, db):
+        self.db = db
+        self.last_used = time.monotonic()
+        self.in_use = 0
+        self.evicted = False
+
+
+class ChromaPool:
+    """
+    (db_path, collection_name) 별로 열린 Chroma 컬렉션을 보관하는 LRU 풀.
+    크기와 유휴 시간을 넘긴 핸들은 닫히며, 사용 중인 핸들은 반납될 때 닫힌다.
+    """
+
+    def __init__(self, opener, max_size=POOL_MAX_SIZE, max_idle=POOL_MAX_IDLE):
+        self.opener = opener  # (persist_directory, collection_name) -> Chroma
+        self.max_size = max_size
+        self.max_idle = max_idle
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @contextmanager
+    def lease(self, db_path, collection_name):
+        """풀에서 컬렉션을 빌려 쓰고, 블록이 끝나면 반납한다."""
+        key = (db_path, collection_name)
+        entry = self._acquire(key)
+        try:
+            yield entry.db
+        finally:
+            self._release(key, entry)
+
+    @asynccontextmanager
+    async def alease(self, db_path, collection_name):
+        """lease 의 비동기 버전. 저장소를 열고 닫는 작업은 스레드에서 수행한다."""
+        key = (db_path, collection_name)
+        entry = await asyncio.to_thread(self._acquire, key)
+        try:
+            yield entry.db
+        finally:
+            await asyncio.to_thread(self._release, key, entry)
+
+    def _acquire(self, key):
+        with self._lock:
+            closing = self._evict_idle()
+            entry = self._entries.get(key)
+            if entry is not None:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                entry.in_use += 1
+            else:
+                self.misses += 1
+        self._close_all(closing)
+        if entry is not None:
+            return entry
+
+        # 디스크에서 여는 작업은 락 밖에서 수행
+        entry = _Entry(self.opener(*key))
+        entry.in_use = 1
+        with self._lock:
+            existing = self._entries.get(key)
+            if existing is not None:
+                # 다른 스레드가 먼저 열었다면 그 핸들을 사용하고 새로 연 핸들은 버린다
+                existing.in_use += 1
+                entry = existing
+                closing = []
+            else:
+                self._entries[key] = entry
+                closing = self._evict_overflow()
+        self._close_all(closing)
+        return entry
+
+    def _release(self, key, entry):
+        with self._lock:
+            entry.in_use -= 1
+            entry.last_used = time.monotonic()
+            closing = [(key, entry)] if entry.evicted and entry.in_use == 0 else []
+            # 사용 중이라 밀려나지 못했던 핸들 정리
+            closing += self._evict_overflow()
+        self._close_all(closing)
+
+    def _evict(self, key):
+        # self._lock 을 잡은 상태에서 호출. 바로 닫아도 되는 핸들을 반환한다.
+        entry = self._entries.pop(key)
+        entry.evicted = True
+        self.evictions += 1
+        return [(key, entry)] if entry.in_use == 0 else []
+
+    def _evict_idle(self):
+        now = time.monotonic()
+        closing = []
+        for key in [k for k, e in self._entries.items() if e.in_use == 0 and now - e.last_used > self.max_idle]:
+            closing += self._evict(key)
+        return closing
+
+    def _evict_overflow(self):
+        closing = []
+        for key in list(self._entries):
+            if len(self._entries) <= self.max_size:
+                break
+            if self._entries[key].in_use == 0:
+                closing += self._evict(key)
+        return closing
+
+    def _close_all(self, closing):
+        for key, entry in closing:
+            self._close_unshared(key, entry)
+
+    def _close_unshared(self, key, entry):
+        # 같은 db_path 를 쓰는 다른 핸들이 풀에 남아 있으면 공유 시스템을 멈추지 않는다
+        with self._lock:
+            shared = any(k[0] == key[0] for k in self._entries)
+        if not shared:
+            close_chroma(entry.db)
+        logging.debug(f"Chroma 핸들 반납: {key}")
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
@@ -0,0 +1,67 @@
+import os
+import time
+import logging
+import threading
+from django.conf import settings
+from langchain.prompts import ChatPromptTemplate
+
+PROMPT_DIR = os.getenv("PROMPT_DIR", os.path.join(settings.BASE_DIR, "data/prompt"))
+# 프롬프트 파일 수정 여부를 확인하는 최소 간격 (초). 요청마다 stat 하지 않는다.
+PROMPT_CHECK_INTERVAL = float(os.getenv("PROMPT_CHECK_INTERVAL", 1.0))
+
+
+class PromptRegistry:
+    """
+    data/prompt/*.txt 를 한 번 읽어 ChatPromptTemplate 으로 만들어 두고,
+    파일 수정 시각이 바뀌면 다시 읽는다 (재시작 없이 프롬프트 수정 반영).
+    chain() 으로 프롬프트별로 미리 만든 체인을 받을 수 있으며, 프롬프트가 바뀌면 체인도 다시 만든다.
+    """
+
+    def __init__(self, prompt_dir=PROMPT_DIR, check_interval=PROMPT_CHECK_INTERVAL):
+        self.prompt_dir = prompt_dir
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._prompts = {}  # name -> (mtime_ns, text, template, checked_at)
+        self._chains = {}   # (name, build) -> (mtime_ns, chain)
+
+    def _load(self, name):
+        now = time.monotonic()
+        entry = self._prompts.get(name)
+        if entry and now - entry[3] < self.check_interval:
+            return entry
+
+        path = os.path.join(self.prompt_dir, name)
+        mtime_ns = os.stat(path).st_mtime_ns
+        if entry and entry[0] == mtime_ns:
+            entry = (entry[0], entry[1], entry[2], now)
+        else:
+            with open(path, 'r', encoding='utf-8') as file:
+                text = file.read()
+            entry = (mtime_ns, text, ChatPromptTemplate.from_template(text), now)
+            if name in self._prompts:
+                logging.info(f"프롬프트 다시 읽음: {name}")
+        self._prompts[name] = entry
+        return entry
+
+    def text(self, name):
+        with self._lock:
+            return self._load(name)[1]
+
+    def template(self, name):
+        with self._lock:
+            return self._load(name)[2]
+
+    def chain(self, name, build):
+        """build(template) 로 만든 체인을 프롬프트 버전별로 재사용"""
+        with self._lock:
+            mtime_ns, _, template, _ = self._load(name)
+            cached = self._chains.get((name, build))
+            if cached and cached[0] == mtime_ns:
+                return cached[1]
+        chain = build(template)
+        with self._lock:
+            self._chains[(name, build)] = (mtime_ns, chain)
+        return chain
+
+
+prompt_registry = PromptRegistry()
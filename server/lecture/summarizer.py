@@ -0,0 +1,141 @@
+import os
+import time
+import logging
+import hashlib
+import threading
+from langchain.chat_models import ChatOpenAI
+from langchain_core.output_parsers import StrOutputParser
+from .media_cache import LECTURE_CACHE_DIR
+from .prompts import prompt_registry
+
+LECTURE_SUMMARY_MODEL = os.getenv("LECTURE_SUMMARY_MODEL", "gpt-4o-mini")
+# 한 번의 요약 호출에 넣는 최대 글자 수 (map 단위 / reduce 묶음)
+LECTURE_SUMMARY_MAP_CHARS = int(os.getenv("LECTURE_SUMMARY_MAP_CHARS", 6000))
+LECTURE_SUMMARY_REDUCE_CHARS = int(os.getenv("LECTURE_SUMMARY_REDUCE_CHARS", 12000))
+LECTURE_SUMMARY_CONCURRENCY = int(os.getenv("LECTURE_SUMMARY_CONCURRENCY", 4))
+SUMMARY_CACHE_DIR = os.path.join(LECTURE_CACHE_DIR, "summaries")
+
+
+def group_texts(texts, max_chars):
+    """순서를 유지하면서 합친 길이가 max_chars 를 넘지 않도록 묶는다 (하나가 더 길면 단독 묶음)"""
+    groups, current, size = [], [], 0
+    for text in texts:
+        if current and size + len(text) > max_chars:
+            groups.append(current)
+            current, size = [], 0
+        current.append(text)
+        size += len(text)
+    if current:
+        groups.append(current)
+    return groups
+
+
+class LectureSummarizer:
+    """
+    긴 강의를 계층적으로 요약한다.
+    1) map: 시간 순서의 청크를 map_chars 단위로 묶어 병렬로 부분 요약
+    2) reduce: 부분 요약을 reduce_chars 단위로 묶어 하나가 될 때까지 반복 요약 (트리)
+    3) 마지막 단계에서 lecture_summary_prompt.txt 형식으로 최종 요약
+    map/reduce 결과는 (모델, 프롬프트, 입력) 해시로 디스크에 캐시되므로
+    최종 프롬프트만 바꿔 다시 요약하면 부분 요약을 다시 만들지 않는다.
+    """
+
+    def __init__(self, model=LECTURE_SUMMARY_MODEL, map_chars=LECTURE_SUMMARY_MAP_CHARS,
+                 reduce_chars=LECTURE_SUMMARY_REDUCE_CHARS, concurrency=LECTURE_SUMMARY_CONCURRENCY,
+                 cache_dir=SUMMARY_CACHE_DIR, llm=None):
+        self.model = model
+        self.map_chars = map_chars
+        self.reduce_chars = reduce_chars
+        self.concurrency = concurrency
+        self.cache_dir = cache_dir
+        self._llm = llm
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def llm(self):
+        if self._llm is None:
+            self._llm = ChatOpenAI(model_name=self.model, temperature=1)
+        return self._llm
+
+    def _build_chain(self, prompt_template):
+        return prompt_template | self.llm | StrOutputParser()
+
+    def _cache_path(self, prompt_text, context):
+        digest = hashlib.sha256(f"{self.model}\x00{prompt_text}\x00{context}".encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, digest[:2], f"{digest}.txt")
+
+    def _read_cache(self, path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _write_cache(self, path, summary):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(summary)
+        os.replace(tmp_path, path)
+
+    def _summarize_all(self, prompt_name, contexts):
+        """같은 프롬프트로 여러 입력을 병렬 요약 (캐시에 있는 입력은 건너뜀)"""
+        prompt_text = prompt_registry.text(prompt_name)
+        paths = [self._cache_path(prompt_text, context) for context in contexts]
+        results = [self._read_cache(path) for path in paths]
+        missing = [index for index, result in enumerate(results) if result is None]
+        with self._lock:
+            self.hits += len(contexts) - len(missing)
+            self.misses += len(missing)
+
+        if missing:
+            chain = prompt_registry.chain(prompt_name, self._build_chain)
+            # 일부 호출이 실패해도 성공한 부분 요약은 캐시에 남겨 재시도 때 다시 비용을 내지 않는다
+            outputs = chain.batch(
+                [{"context": contexts[index]} for index in missing],
+                config={"max_concurrency": self.concurrency},
+                return_exceptions=True
+            )
+            errors = []
+            for index, output in zip(missing, outputs):
+                if isinstance(output, Exception):
+                    errors.append(output)
+                    continue
+                self._write_cache(paths[index], output)
+                results[index] = output
+            if errors:
+                logging.error(f"부분 요약 실패 {len(errors)}/{len(missing)}개 ({prompt_name})")
+                raise errors[0]
+        return results
+
+    def summarize(self, documents, final_prompt="lecture_summary_prompt.txt"):
+        started = time.perf_counter()
+        texts = [doc.page_content for doc in documents]
+
+        # 짧은 강의는 바로 최종 요약
+        if sum(len(text) for text in texts) > self.reduce_chars:
+            texts = self._summarize_all(
+                "lecture_chunk_summary_prompt.txt",
+                ["\n\n".join(group) for group in group_texts(texts, self.map_chars)]
+            )
+            level = 1
+            while sum(len(text) for text in texts) > self.reduce_chars and len(texts) > 1:
+                groups = group_texts(texts, self.reduce_chars)
+                if len(groups) == len(texts):
+                    # 부분 요약 하나하나가 너무 길면 두 개씩 묶어 트리 높이를 줄인다
+                    groups = [texts[index:index + 2] for index in range(0, len(texts), 2)]
+                texts = self._summarize_all("lecture_reduce_prompt.txt", ["\n\n".join(group) for group in groups])
+                level += 1
+            logging.info(f"강의 요약: 청크 {len(documents)}개, {level}단계")
+
+        final_chain = prompt_registry.chain(final_prompt, self._build_chain)
+        summary = final_chain.invoke({"context": "\n\n".join(texts)})
+        logging.info(f"강의 요약 시간: {time.perf_counter() - started:.1f}초, 캐시 {self.stats()}")
+        return summary
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / total if total else 0.0}
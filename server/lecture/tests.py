@@ -1,3 +1,155 @@
-from django.test import TestCase
+import os
+import re
+import json
+import wave
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+import requests
+from django.test import SimpleTestCase
+
+from src import stt
+
+RATE = 16000
+
+
+class FakeResponse:
+    def __init__(self, status_code, body=None):
+        self.status_code = status_code
+        self.body = body or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code}", response=self)
+
+    def json(self):
+        return self.body
+
+
+class FakeSession:
+    """응답(또는 예외)을 순서대로 돌려주는 requests.Session 대역"""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    def post(self, *args, **kwargs):
+        self.calls += 1
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+COMPLETED = FakeResponse(200, {"result": "COMPLETED", "text": "안녕하세요"})
+
+
+@mock.patch("src.stt.time.sleep", lambda seconds: None)
+class TranscribeRetryTests(SimpleTestCase):
+    def transcribe(self, session):
+        return stt.transcribe_with_retry(
+            lambda: stt.clova_request(session, "http://stt", "key", b"", "segment_0.wav"), max_retries=3
+        )
+
+    def test_retries_server_errors_and_rate_limits(self):
+        session = FakeSession(FakeResponse(503), FakeResponse(429), COMPLETED)
+        self.assertEqual(self.transcribe(session)["text"], "안녕하세요")
+        self.assertEqual(session.calls, 3)
+
+    def test_retries_network_errors(self):
+        session = FakeSession(requests.ConnectionError(), requests.Timeout(), COMPLETED)
+        self.assertEqual(self.transcribe(session)["text"], "안녕하세요")
+        self.assertEqual(session.calls, 3)
+
+    def test_does_not_retry_client_errors(self):
+        for status in (400, 401, 403):
+            session = FakeSession(FakeResponse(status), COMPLETED)
+            with self.assertRaises(requests.HTTPError):
+                self.transcribe(session)
+            self.assertEqual(session.calls, 1)
+
+    def test_non_completed_result_raises(self):
+        session = FakeSession(FakeResponse(200, {"result": "FAILED", "message": "invalid media"}), COMPLETED)
+        with self.assertRaises(stt.STTError):
+            self.transcribe(session)
+        self.assertEqual(session.calls, 1)
+
+    def test_gives_up_after_max_retries(self):
+        session = FakeSession(*[FakeResponse(500)] * 4)
+        with self.assertRaises(requests.HTTPError):
+            self.transcribe(session)
+        self.assertEqual(session.calls, 4)
+
+
+class StubClovaHandler(BaseHTTPRequestHandler):
+    """
+    segment_<n>.wav 마다 두 문장을 돌려주는 CLOVA Speech 대역.
+    - 앞쪽 겹침 구간(0~100ms)의 "overlap<n>" 은 앞 구간 담당이므로 합칠 때 빠져야 한다.
+    - 구간 안쪽(300~400ms)의 "segment<n>" 은 남아야 한다.
+    앞 구간일수록 늦게 응답해 완료 순서와 관계없이 원래 순서로 합치는지 확인한다.
+    """
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        index = int(re.search(rb'filename="segment_(\d+)\.wav"', body).group(1))
+        threading.Event().wait(max(0, 0.2 - 0.05 * index))
+        segments = [{"start": 300, "end": 400, "text": f"segment{index}"}]
+        if index > 0:
+            segments.insert(0, {"start": 0, "end": 100, "text": f"overlap{index}"})
+        payload = json.dumps({
+            "result": "COMPLETED",
+            "text": " ".join(segment["text"] for segment in segments),
+            "segments": segments,
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+class TranscribeLongAudioTests(SimpleTestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubClovaHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        # 1초 소리 + 1초 무음을 반복한 6초 오디오
+        tone = (np.sin(np.arange(RATE) * 2 * np.pi * 440 / RATE) * 8000).astype(np.int16)
+        self.samples = np.concatenate([np.concatenate([tone, np.zeros(RATE, np.int16)]) for _ in range(3)])
+        fd, self.wav_path = tempfile.mkstemp(suffix=".wav")
+        os.close(fd)
+        self.addCleanup(os.remove, self.wav_path)
+        with wave.open(self.wav_path, "wb") as f:
+            f.setnchannels(1)
+            f.setsampwidth(2)
+            f.setframerate(RATE)
+            f.writeframes(self.samples.tobytes())
+
+    def plan(self):
+        return stt.plan_segments(self.samples.reshape(-1, 1), RATE, segment_seconds=2.5, overlap_seconds=0.2, search_seconds=1)
+
+    def test_plan_segments_cuts_at_silence(self):
+        segments = self.plan()
+        self.assertGreater(len(segments), 1)
+        for (_, _, _, core_end), (_, _, next_start, _) in zip(segments, segments[1:]):
+            self.assertEqual(core_end, next_start)
+            self.assertFalse(self.samples[core_end:core_end + RATE // 100].any())
+
+    def test_segments_are_stitched_in_order_without_overlap_duplicates(self):
+        url = f"http://127.0.0.1:{self.server.server_port}/"
+        result = stt.transcribe_long_audio(
+            self.wav_path, url, "key", segment_seconds=2.5, overlap_seconds=0.2, concurrency=4
+        )
+        expected = [f"segment{index}" for index in range(len(self.plan()))]
+        self.assertEqual(result["text"], " ".join(expected))
+        self.assertEqual([segment["text"] for segment in result["segments"]], expected)
+        starts = [segment["start"] for segment in result["segments"]]
+        self.assertEqual(starts, sorted(starts))
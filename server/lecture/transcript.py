@@ -0,0 +1,101 @@
+import os
+from langchain.schema import Document
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+LECTURE_CHUNK_SIZE = int(os.getenv("LECTURE_CHUNK_SIZE", 1000))  # 글자 수
+LECTURE_CHUNK_OVERLAP = int(os.getenv("LECTURE_CHUNK_OVERLAP", 100))
+
+
+def format_timestamp(ms):
+    seconds = int(ms // 1000)
+    hours, seconds = divmod(seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes:02d}:{seconds:02d}"
+
+
+def split_segments(segments, chunk_size):
+    """chunk_size 보다 긴 STT 구간은 나누고, 구간 안에서의 글자 위치로 시각을 보간한다."""
+    splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=0)
+    for segment in segments:
+        text = segment["text"].strip()
+        if not text:
+            continue
+        if len(text) <= chunk_size:
+            yield segment["start"], segment["end"], text
+            continue
+        pieces = splitter.split_text(text)
+        total = sum(len(piece) for piece in pieces)
+        duration = segment["end"] - segment["start"]
+        offset = 0
+        for piece in pieces:
+            start = segment["start"] + duration * offset // total
+            offset += len(piece)
+            yield start, segment["start"] + duration * offset // total, piece
+
+
+def overlap_tail(pieces, chunk_overlap):
+    """
+    청크 끝에서 chunk_overlap 글자 이내의 꼬리를 다음 청크 앞에 다시 넣을 조각으로 만든다.
+    통째로 들어가지 않는 구간은 뒤쪽 글자만 잘라 쓰고 시작 시각은 글자 위치로 보간한다.
+    """
+    tail, size = [], 0
+    for start, end, text in reversed(pieces):
+        if size + len(text) <= chunk_overlap:
+            tail.insert(0, (start, end, text))
+            size += len(text) + 1
+            continue
+        budget = chunk_overlap - size
+        if budget > 0:
+            cut = len(text) - budget
+            # 단어 중간에서 잘리지 않도록 다음 공백부터 시작
+            space = text.find(" ", cut)
+            if cut > 0 and not text[cut - 1].isspace() and space != -1:
+                cut = space + 1
+            piece = text[cut:].strip()
+            if piece:
+                tail.insert(0, (start + (end - start) * cut // len(text), end, piece))
+        break
+    return tail
+
+
+def transcript_documents(transcript, unique_name, chunk_size=LECTURE_CHUNK_SIZE, chunk_overlap=LECTURE_CHUNK_OVERLAP):
+    """
+    STT 결과({"text", "segments"})를 시간 순서의 겹치는 청크 Document 로 만든다.
+    각 청크 앞에 [시작-끝] 시각을 붙이고 메타데이터에 start_ms/end_ms 를 남긴다.
+    타임스탬프가 없는 결과는 글자 수 기준으로만 나눈다.
+    """
+    segments = transcript.get("segments")
+    if not segments:
+        splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+        return [
+            Document(page_content=text, metadata={"unique_name": unique_name, "chunk": index})
+            for index, text in enumerate(splitter.split_text(transcript["text"]))
+        ]
+
+    chunks, current, size = [], [], 0
+    for piece in split_segments(segments, chunk_size):
+        if current and size + len(piece[2]) > chunk_size:
+            chunks.append(current)
+            # 다음 청크는 앞 청크 끝의 글자 일부를 다시 포함해 시작
+            current = overlap_tail(current, chunk_overlap)
+            size = sum(len(piece[2]) for piece in current)
+        current.append(piece)
+        size += len(piece[2])
+    if current:
+        chunks.append(current)
+
+    documents = []
+    for index, pieces in enumerate(chunks):
+        start, end = pieces[0][0], pieces[-1][1]
+        text = " ".join(piece[2] for piece in pieces)
+        documents.append(Document(
+            page_content=f"[{format_timestamp(start)}-{format_timestamp(end)}] {text}",
+            metadata={
+                "unique_name": unique_name,
+                "chunk": index,
+                "start_ms": start,
+                "end_ms": end,
+                "start": format_timestamp(start),
+            }
+        ))
+    return documents
@@ -1,7 +1,9 @@
 from django.urls import path
-from .views import LectureSummaryView, LectureQAView
+from .views import LectureSummaryView, LectureJobStatusView, LectureQAView, lecture_qa_async
 
 urlpatterns = [
     path("summary/", LectureSummaryView.as_view(), name="lecture-summary"),
+    path("jobs/<uuid:job_id>/", LectureJobStatusView.as_view(), name="lecture-job-status"),
     path("qa/", LectureQAView.as_view(), name="lecture-qa"),
+    path("qa/async/", lecture_qa_async, name="lecture-qa-async"),
 ]
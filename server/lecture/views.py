@@ -1,44 +1,36 @@
 import os
 import uuid
-import subprocess
-import requests
 import json
 from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
 from rest_framework.views import APIView
 from rest_framework.parsers import MultiPartParser, FormParser
 from dotenv import load_dotenv
 from langchain_chroma import Chroma
-from langchain_openai.embeddings import OpenAIEmbeddings
-from langchain.prompts import ChatPromptTemplate
 from langchain.chat_models import ChatOpenAI
-from langchain.chains import RetrievalQA
-from langchain.schema import Document
-from .models import LectureSummary
+from langchain.chains.question_answering import load_qa_chain
+from src.embedding_cache import get_embeddings
+from src.media import download_audio, extract_audio
+from src.stt import transcribe_long_audio
+from . import jobs
+from .media_cache import (
+    canonical_video_key, save_upload, file_sha256, cached_audio_path, load_transcript, save_transcript
+)
+from .models import LectureSummary, LectureJob
+from .pool import ChromaPool
+from .prompts import prompt_registry
+from .summarizer import LectureSummarizer
+from .transcript import transcript_documents
 
 load_dotenv()
 
-embeddings = OpenAIEmbeddings(model="text-embedding-3-small")
+LECTURE_QA_K = int(os.getenv("LECTURE_QA_K", 4))
+
+embeddings = get_embeddings("text-embedding-3-small")
  
 def generate_unique_name(prefix="file"):
     return f"{prefix}_{uuid.uuid4().hex[:8]}"
 
-# 클로바 API 호출을 통해 텍스트 변환
-def transcribe_audio_to_text(media_file_path, api_url, api_key):
-    headers = {'X-CLOVASPEECH-API-KEY': api_key}
-    with open(media_file_path, 'rb') as media_file:
-        files = {'media': media_file}
-        params = {
-            "language": "ko-KR",
-            "completion": "sync",
-            "callback": "",
-            "fullText": True
-        }
-        data = {'params': json.dumps(params), 'type': "application/json"}
-        response = requests.post(api_url, headers=headers, files=files, data=data)
-        response.raise_for_status()
-        return response.json().get("text", "")
-
-
 def create_chroma_db(persist_directory, collection_name):
     """Create or load a ChromaDB."""
     return Chroma(
@@ -47,127 +39,198 @@ def create_chroma_db(persist_directory, collection_name):
         embedding_function=embeddings
     )
 
-# 프롬프트
-def load_prompt(prompt_file):
-    with open(prompt_file, 'r', encoding='utf-8') as file:
-        return file.read()
+# 강의별 Chroma 컬렉션 핸들 풀 (워커 프로세스 단위)
+chroma_pool = ChromaPool(opener=create_chroma_db)
 
-# 동영상 요약
-def summarize_lecture(db, query):
-    retriever = db.as_retriever()
-    prompt_file = './data/prompt/lecture_summary_prompt.txt'
-    prompt_template_text = load_prompt(prompt_file)
-    prompt_template = ChatPromptTemplate.from_template(prompt_template_text)
+# 동영상 요약 (긴 강의는 부분 요약을 트리 형태로 합쳐 요약)
+lecture_summarizer = LectureSummarizer()
 
-    llm = ChatOpenAI(model_name="gpt-4o-mini", temperature=1)
-    chain = RetrievalQA.from_chain_type(
+def summarize_lecture(documents):
+    return lecture_summarizer.summarize(documents)
+
+# 동영상 요약 바탕 qa (체인은 프롬프트 파일이 바뀔 때만 다시 만든다)
+def build_qa_chain(prompt_template):
+    llm = ChatOpenAI(model_name="gpt-4o-mini", temperature=0.7)
+    return load_qa_chain(
         llm=llm,
         chain_type="stuff",
-        retriever=retriever,
-        chain_type_kwargs={"prompt": prompt_template},
+        prompt=prompt_template,
         verbose=True
     )
-    return chain.run(query)
 
-# 동영상 요약 바탕 qa
 def answer_question(db, question):
-    retriever = db.as_retriever()
-    prompt_file = './data/prompt/lecture_qa_prompt.txt'
-    prompt_template_text = load_prompt(prompt_file)
-    prompt_template = ChatPromptTemplate.from_template(prompt_template_text)
+    qa_chain = prompt_registry.chain("lecture_qa_prompt.txt", build_qa_chain)
+    # 강의 전체가 아니라 질문과 가까운 청크 k 개만 프롬프트에 넣는다
+    documents = db.similarity_search(question, k=LECTURE_QA_K)
+    return qa_chain.run(input_documents=documents, question=question)
 
-    llm = ChatOpenAI(model_name="gpt-4o-mini", temperature=0.7)
-    qa_chain = RetrievalQA.from_chain_type(
-        llm=llm,
-        chain_type="stuff",
-        retriever=retriever,
-        chain_type_kwargs={"prompt": prompt_template},
-        verbose=True
+async def aanswer_question(db, question):
+    qa_chain = prompt_registry.chain("lecture_qa_prompt.txt", build_qa_chain)
+    documents = await db.asimilarity_search(question, k=LECTURE_QA_K)
+    return await qa_chain.arun(input_documents=documents, question=question)
+
+
+VIDEO_DIR = './data/video'
+DB_BASE_PATH = './chroma_db/lecture_summary'
+
+
+def lecture_keys(unique_name):
+    """요청에 들어온 이름과 그 정규 키 (정규 키 도입 이전에 저장된 요약도 찾을 수 있도록)"""
+    unique_name = unique_name.strip()
+    if unique_name.startswith(("youtube:", "url:", "sha256:")):
+        return [unique_name]
+    return [unique_name, canonical_video_key(unique_name)]
+
+
+def remove_upload(job):
+    """음성을 캐시한 뒤에는 저장해 둔 업로드 원본이 필요 없다"""
+    if job.upload_path:
+        try:
+            os.remove(job.upload_path)
+        except FileNotFoundError:
+            pass
+
+
+def release_upload(upload_path, unique_key, job=None):
+    """
+    새 작업을 만들지 않은 요청의 업로드 원본을 지운다.
+    진행 중인 작업이 아직 음성을 추출하지 않았으면 그 작업이 읽어야 하므로 남겨둔다.
+    """
+    if not upload_path:
+        return
+    if job is not None and job.status in jobs.ACTIVE_STATUSES and not os.path.exists(cached_audio_path(unique_key)):
+        return
+    try:
+        os.remove(upload_path)
+    except FileNotFoundError:
+        pass
+
+
+def prepare_audio(job):
+    """정규 키별로 캐시된 16kHz 모노 WAV 를 반환 (없으면 다운로드/추출 후 저장)"""
+    audio_path = cached_audio_path(job.unique_name)
+    if os.path.exists(audio_path):
+        remove_upload(job)
+        return audio_path
+
+    if job.video_url:
+        # 영상 전체가 아니라 오디오 스트림만 내려받는다
+        jobs.set_stage(job, "download")
+        source_path = download_audio(job.video_url, VIDEO_DIR, generate_unique_name("download"))
+    else:
+        source_path = job.upload_path
+
+    # 동영상 -> 음성파일 변환 (16kHz 모노 WAV 로 한 번에 추출)
+    jobs.set_stage(job, "extract_audio")
+    os.makedirs(os.path.dirname(audio_path), exist_ok=True)
+    tmp_path = f"{audio_path}.{os.getpid()}.tmp.wav"
+    extract_audio(source_path, tmp_path)
+    os.replace(tmp_path, audio_path)
+    # 음성을 캐시했으므로 원본 다운로드/업로드는 필요 없다
+    if job.video_url:
+        os.remove(source_path)
+    else:
+        remove_upload(job)
+    return audio_path
+
+
+def process_lecture_job(job):
+    """
+    강의 작업 하나를 처리한다 (lecture_worker 에서 실행).
+    다운로드 -> 음성 변환 -> STT -> 임베딩 -> 요약 순서로 진행하며 단계마다 상태를 기록한다.
+    음성은 정규 키로, STT 결과와 임베딩/요약은 음성 내용 해시로 캐시되어 있으면 해당 단계를 건너뛴다.
+    """
+    api_url = os.getenv('API_URL')
+    api_key = os.getenv('API_KEY')
+
+    audio_path = prepare_audio(job)
+    audio_hash = file_sha256(audio_path)
+
+    transcript = load_transcript(audio_hash)
+    if transcript is None:
+        jobs.set_stage(job, "transcribe")
+        transcript = transcribe_long_audio(audio_path, api_url, api_key)
+        save_transcript(audio_hash, transcript)
+
+    # 다른 키(다른 URL/업로드)로 같은 내용을 이미 처리했으면 그 컬렉션과 요약을 그대로 사용
+    same_content = LectureSummary.objects.filter(content_hash=audio_hash).exclude(summary=None).first()
+    if same_content:
+        collection_name, db_path, summary = same_content.collection_name, same_content.db_path, same_content.summary
+    else:
+        collection_name = generate_unique_name("collection")
+        db_path = os.path.join(DB_BASE_PATH, collection_name)
+        documents = transcript_documents(transcript, job.unique_name)
+        with chroma_pool.lease(db_path, collection_name) as db:
+            # 같은 텍스트의 임베딩은 임베딩 캐시에서 가져온다
+            jobs.set_stage(job, "embed")
+            db.add_documents(documents, ids=[f"{audio_hash}-{index}" for index in range(len(documents))])
+
+        jobs.set_stage(job, "summarize")
+        summary = summarize_lecture(documents)
+
+    LectureSummary.objects.update_or_create(
+        unique_name=job.unique_name,
+        defaults={"collection_name": collection_name, "db_path": db_path, "summary": summary, "content_hash": audio_hash}
     )
-    return qa_chain.run(question)
 
 
 class LectureSummaryView(APIView):
+    """
+    요약이 이미 있으면 바로 반환하고, 없으면 작업을 큐에 넣고 job_id 를 반환한다 (202).
+    처리는 lecture_worker 관리 명령이 수행하며 진행 상황은 jobs/<job_id>/ 로 조회한다.
+    URL 은 정규 영상 키, 업로드 파일은 내용 해시가 unique_name 이 된다.
+    """
     parser_classes = [MultiPartParser, FormParser]
 
     def post(self, request):
-        api_url = os.getenv('API_URL')
-        api_key = os.getenv('API_KEY')
-        video_dir = './data/video'
-        audio_dir = './data/audio'
-        db_base_path = './chroma_db/lecture_summary'
-
-        os.makedirs(video_dir, exist_ok=True)
-        os.makedirs(audio_dir, exist_ok=True)
-
         video_url = request.data.get('video_url')
         video_file = request.FILES.get('video_file')
 
-        try:
-            unique_key = video_url.strip() if video_url else video_file.name
+        if not video_url and not video_file:
+            return JsonResponse({"error": "video_url or video_file is required."}, status=400)
 
-            lecture_summary = LectureSummary.objects.filter(unique_name=unique_key).first()
+        try:
+            upload_path = None
+            if video_url:
+                video_url = video_url.strip()
+                unique_key = canonical_video_key(video_url)
+                keys = [unique_key, video_url]
+            else:
+                # 업로드 파일은 요청이 끝나면 사라지므로 워커가 읽을 수 있게 내용 해시 이름으로 저장
+                unique_key, upload_path = save_upload(video_file)
+                keys = [unique_key, video_file.name]
+
+            lecture_summary = LectureSummary.objects.filter(unique_name__in=keys).first()
             if lecture_summary:
-                db = create_chroma_db(
-                    persist_directory=lecture_summary.db_path,
-                    collection_name=lecture_summary.collection_name
-                )
+                release_upload(upload_path, unique_key)
                 return JsonResponse({
                     "unique_name": lecture_summary.unique_name,
                     "summary": lecture_summary.summary
                 }, status=200)
 
-            collection_name = generate_unique_name("collection")
-            db_path = os.path.join(db_base_path, collection_name)
-            video_input_path = None
-            mp4_path = os.path.join(video_dir, f"{collection_name}.mp4")
-
-            if video_url:
-
-                video_input_path = os.path.join(video_dir, f"{collection_name}.%(ext)s")
-                subprocess.run(["yt-dlp", "-o", video_input_path, video_url], check=True)
-  
-                if os.path.exists(video_input_path.replace("%(ext)s", "webm")):
-                    video_input_path = video_input_path.replace("%(ext)s", "webm")
-                elif os.path.exists(video_input_path.replace("%(ext)s", "mkv")):
-                    video_input_path = video_input_path.replace("%(ext)s", "mkv")
-                else:
-                    raise ValueError("Downloaded video file not found.")
-
-            elif video_file:
-                ext = os.path.splitext(video_file.name)[-1].lower()
-                video_input_path = os.path.join(video_dir, f"{collection_name}{ext}")
-                with open(video_input_path, 'wb') as out_file:
-                    for chunk in video_file.chunks():
-                        out_file.write(chunk)
-
-            # 동영상 -> 음성파일 변환
-            subprocess.run(["ffmpeg", "-i", video_input_path, "-c:v", "copy", "-c:a", "aac", mp4_path], check=True)
-
-
-            audio_path = os.path.join(audio_dir, f"{collection_name}.wav")
-            subprocess.run(["ffmpeg", "-i", mp4_path, "-vn", "-acodec", "pcm_s16le", "-ar", "44100", "-ac", "2", audio_path], check=True)
-
-            
-            lecture_text = transcribe_audio_to_text(audio_path, api_url, api_key)
+            job = LectureJob.objects.filter(unique_name=unique_key, status__in=jobs.ACTIVE_STATUSES).first()
+            if job:
+                release_upload(upload_path, unique_key, job)
+                return JsonResponse(jobs.job_status(job), status=202)
 
+            job, created = jobs.enqueue(unique_key, video_url=video_url, upload_path=upload_path)
+            if not created:
+                release_upload(upload_path, unique_key, job)
+            return JsonResponse(jobs.job_status(job), status=202)
+        except Exception as e:
+            return JsonResponse({"error": str(e)}, status=500)
 
-            db = create_chroma_db(persist_directory=db_path, collection_name=collection_name)
-            db.add_documents([Document(page_content=lecture_text)])
 
+class LectureJobStatusView(APIView):
+    def get(self, request, job_id):
+        job = LectureJob.objects.filter(id=job_id).first()
+        if not job:
+            return JsonResponse({"error": "Job not found."}, status=404)
 
-            summary = summarize_lecture(db, "Summarize the lecture content.")
-
-            LectureSummary.objects.create(
-                unique_name=unique_key,
-                collection_name=collection_name,
-                db_path=db_path,
-                summary=summary
-            )
-
-            return JsonResponse({"unique_name": unique_key, "summary": summary}, status=200)
-        except Exception as e:
-            return JsonResponse({"error": str(e)}, status=500)
+        summary = None
+        if job.status == LectureJob.STATUS_DONE:
+            summary = LectureSummary.objects.filter(unique_name=job.unique_name).values_list("summary", flat=True).first()
+        return JsonResponse(jobs.job_status(job, summary), status=200)
 
 
 
@@ -180,15 +243,40 @@ class LectureQAView(APIView):
             return JsonResponse({"error": "unique_name and question are required."}, status=400)
 
         try:
-            lecture_summary = LectureSummary.objects.filter(unique_name=unique_name).first()
+            lecture_summary = LectureSummary.objects.filter(unique_name__in=lecture_keys(unique_name)).first()
             if not lecture_summary:
                 return JsonResponse({"error": "Lecture summary not found."}, status=404)
 
-            db = create_chroma_db(
-                persist_directory=lecture_summary.db_path,
-                collection_name=lecture_summary.collection_name
-            )
-            answer = answer_question(db, question)
+            with chroma_pool.lease(lecture_summary.db_path, lecture_summary.collection_name) as db:
+                answer = answer_question(db, question)
             return JsonResponse({"answer": answer}, status=200)
         except Exception as e:
             return JsonResponse({"error": str(e)}, status=500)
+
+
+@csrf_exempt
+async def lecture_qa_async(request):
+    """LectureQAView 의 비동기 버전 (ASGI). JSON 또는 form 요청을 받는다."""
+    if request.method != 'POST':
+        return JsonResponse({"error": "Invalid request method."}, status=400)
+
+    try:
+        data = json.loads(request.body) if request.content_type == "application/json" else request.POST
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "Invalid JSON format."}, status=400)
+    unique_name = data.get('unique_name')
+    question = data.get('question')
+
+    if not unique_name or not question:
+        return JsonResponse({"error": "unique_name and question are required."}, status=400)
+
+    try:
+        lecture_summary = await LectureSummary.objects.filter(unique_name__in=lecture_keys(unique_name)).afirst()
+        if not lecture_summary:
+            return JsonResponse({"error": "Lecture summary not found."}, status=404)
+
+        async with chroma_pool.alease(lecture_summary.db_path, lecture_summary.collection_name) as db:
+            answer = await aanswer_question(db, question)
+        return JsonResponse({"answer": answer}, status=200)
+    except Exception as e:
+        return JsonResponse({"error": str(e)}, status=500)
@@ -1,5 +1,12 @@
 from django.apps import AppConfig
+import os
 
 class QnaConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'qna'
+
+    def ready(self):
+        # QNA_ENGINE_PRELOAD=true 이면 워커 시작 시 RAG 엔진을 미리 생성
+        if os.getenv("QNA_ENGINE_PRELOAD", "False").lower() == "true":
+            from .engine import get_engine
+            get_engine()
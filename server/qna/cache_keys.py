@@ -0,0 +1,49 @@
+import hashlib
+import os
+import re
+import unicodedata
+
+ANSWER_KEY = "qna:answer:{collection}:{digest}"
+
+
+def normalize_question(question):
+    """대소문자, 공백, 문장부호 차이를 없앤 질문 문자열"""
+    text = unicodedata.normalize("NFKC", question).lower()
+    text = "".join(" " if unicodedata.category(ch).startswith("P") else ch for ch in text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def version_path(persist_directory, collection):
+    return os.path.join(persist_directory, f"{collection}.version")
+
+
+def collection_version(persist_directory, collection):
+    """
+    컬렉션 내용 버전. 문서가 추가될 때마다 bump_collection_version 으로 올린다.
+    프로세스별 캐시(locmem)에 두면 관리 명령에서 올린 값이 웹 워커에 전달되지 않으므로
+    컬렉션 디렉토리의 파일에 저장한다.
+    """
+    try:
+        with open(version_path(persist_directory, collection), "r") as f:
+            return int(f.read().strip() or 1)
+    except (FileNotFoundError, ValueError):
+        return 1
+
+
+def bump_collection_version(persist_directory, collection):
+    """컬렉션의 캐시된 답변을 전체 캐시를 비우지 않고 즉시 무효화 (모든 워커에 반영)"""
+    path = version_path(persist_directory, collection)
+    version = collection_version(persist_directory, collection) + 1
+    os.makedirs(persist_directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(str(version))
+    os.replace(tmp_path, path)
+    return version
+
+
+def answer_cache_key(question, collection, version):
+    """정규화된 질문 + 컬렉션 + 내용 버전으로 만든 길이가 고정된 캐시 키"""
+    raw = f"{collection}\x00{version}\x00{normalize_question(question)}"
+    digest = hashlib.sha256(raw.encode("utf-8")).hexdigest()
+    return ANSWER_KEY.format(collection=collection, digest=digest)
@@ -0,0 +1,246 @@
+import os
+import glob
+import json
+import time
+import atexit
+import logging
+import threading
+from datetime import datetime
+from django.conf import settings
+from django.db import DatabaseError, connections, transaction
+from django.utils import timezone
+from .models import ChatLog
+
+# QNA_CHATLOG_WRITE_BEHIND=true 이면 대화 기록을 요청 경로에서 바로 INSERT 하지 않고 모아서 저장
+CHATLOG_WRITE_BEHIND = os.getenv("QNA_CHATLOG_WRITE_BEHIND", "False").lower() == "true"
+CHATLOG_BATCH_SIZE = int(os.getenv("QNA_CHATLOG_BATCH_SIZE", 100))
+CHATLOG_FLUSH_INTERVAL = float(os.getenv("QNA_CHATLOG_FLUSH_INTERVAL", 1.0))  # 초
+CHATLOG_SPOOL_DIR = os.getenv("QNA_CHATLOG_SPOOL_DIR", os.path.join(settings.BASE_DIR, "data/cache/chatlog_spool"))
+# 저장할 수 없는 기록(삭제된 사용자 등)을 옮겨 두는 파일. 스풀과 같은 JSON 줄 형식이다.
+CHATLOG_DEAD_LETTER = "dead-letter.jsonl"
+
+
+def pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def database_available(alias):
+    """DB 에 연결할 수 있는지 확인 (저장 실패가 DB 장애인지, 특정 기록 문제인지 구분)"""
+    try:
+        connection = connections[alias]
+        connection.close_if_unusable_or_obsolete()
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+        return True
+    except DatabaseError:
+        return False
+
+
+def chatlog_from_line(line):
+    row = json.loads(line)
+    return ChatLog(
+        user_id=row["user_id"],
+        user_input=row["user_input"],
+        chatbot_reply=row["chatbot_reply"],
+        timestamp=datetime.fromisoformat(row["timestamp"]),
+    )
+
+
+class ChatLogWriter:
+    """
+    대화 기록 write-behind 큐.
+    기록은 먼저 프로세스별 append-only 스풀 파일에 한 줄씩 쓰고, 백그라운드 스레드가
+    배치 크기 또는 주기마다 스풀을 세그먼트로 넘겨 bulk_create 한 뒤 세그먼트를 지운다.
+    프로세스가 비정상 종료되면 남은 스풀/세그먼트는 다음 프로세스가 시작할 때 다시 저장한다.
+    (세그먼트 저장 직후 종료되면 같은 기록이 한 번 더 저장될 수 있다)
+    DB 에 연결할 수 없으면 세그먼트를 남겨두고 다음 주기에 다시 시도하고, DB 는 정상인데
+    저장되지 않는 기록은 한 행씩 저장해 실패한 행만 dead-letter 파일로 옮긴다.
+    """
+
+    def __init__(self, spool_dir=CHATLOG_SPOOL_DIR, batch_size=CHATLOG_BATCH_SIZE, flush_interval=CHATLOG_FLUSH_INTERVAL):
+        self.spool_dir = spool_dir
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._pid = None
+        self._spool = None
+        self._pending = 0
+        self._closed = False
+        self._thread = None
+        self.written = 0
+        self.batches = 0
+        self.dead_lettered = 0
+
+    def _spool_path(self):
+        return os.path.join(self.spool_dir, f"chatlog-{self._pid}.jsonl")
+
+    def _start(self):
+        # 프로세스가 fork 된 뒤 처음 기록할 때 스레드와 스풀 파일을 만든다
+        os.makedirs(self.spool_dir, exist_ok=True)
+        self._pid = os.getpid()
+        self._spool = open(self._spool_path(), "a", encoding="utf-8")
+        self._pending = 0
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="chatlog-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def log(self, user_id, user_input, chatbot_reply):
+        line = json.dumps({
+            "user_id": user_id,
+            "user_input": user_input,
+            "chatbot_reply": chatbot_reply,
+            "timestamp": timezone.now().isoformat(),
+        }, ensure_ascii=False)
+        with self._lock:
+            if self._pid != os.getpid():
+                self._start()
+            self._spool.write(line + "\n")
+            self._spool.flush()
+            self._pending += 1
+            if self._pending >= self.batch_size:
+                self._wakeup.notify()
+
+    def _rotate(self):
+        """현재 스풀을 저장할 세그먼트로 넘기고 새 스풀을 연다. (lock 안에서 호출)"""
+        if not self._pending:
+            return
+        self._spool.close()
+        os.replace(self._spool_path(), os.path.join(self.spool_dir, f"chatlog-{self._pid}-{time.time_ns()}.segment"))
+        self._spool = open(self._spool_path(), "a", encoding="utf-8")
+        self._pending = 0
+
+    def _run(self):
+        # 시작하면서 이전에 종료된 프로세스가 남긴 기록부터 저장
+        self._recover()
+        while True:
+            with self._lock:
+                if not self._closed and self._pending < self.batch_size:
+                    self._wakeup.wait(self.flush_interval)
+                self._rotate()
+                closed = self._closed
+            self._flush_segments(f"chatlog-{self._pid}-*.segment")
+            connections.close_all()
+            if closed:
+                return
+
+    def _recover(self):
+        for path in glob.glob(os.path.join(self.spool_dir, "chatlog-*")):
+            name = os.path.basename(path)
+            try:
+                pid = int(name.split("-")[1].split(".")[0])
+            except ValueError:
+                continue
+            if pid == self._pid or pid_alive(pid):
+                continue
+            # 다른 워커와 동시에 복구하지 않도록 이름을 바꿔 선점
+            claimed = os.path.join(self.spool_dir, f"chatlog-{self._pid}-{time.time_ns()}.segment")
+            try:
+                os.replace(path, claimed)
+            except FileNotFoundError:
+                continue
+            logging.info(f"이전 프로세스의 대화 기록 스풀 복구: {name}")
+        self._flush_segments(f"chatlog-{self._pid}-*.segment")
+
+    def _flush_segments(self, pattern):
+        alias = ChatLog.objects.db
+        for path in sorted(glob.glob(os.path.join(self.spool_dir, pattern))):
+            name = os.path.basename(path)
+            with open(path, "r", encoding="utf-8") as f:
+                lines = [line for line in f if line.endswith("\n")]
+            try:
+                with transaction.atomic(using=alias):
+                    ChatLog.objects.bulk_create([chatlog_from_line(line) for line in lines], batch_size=self.batch_size)
+                written, failed, remaining = len(lines), [], []
+            except Exception as e:
+                if not database_available(alias):
+                    # 세그먼트는 남겨두고 다음 주기에 다시 시도 (뒤의 세그먼트도 같은 이유로 실패하므로 중단)
+                    logging.error(f"대화 기록 저장 실패, 다시 시도 예정 ({name}): {e}")
+                    return
+                logging.warning(f"대화 기록 일괄 저장 실패, 한 행씩 저장 ({name}): {e}")
+                written, failed, remaining = self._save_rows(lines, alias)
+
+            if failed:
+                self._dead_letter(failed)
+            if remaining:
+                # 한 행씩 저장하던 중 DB 에 연결할 수 없게 되면 남은 행만 세그먼트에 남긴다
+                tmp_path = f"{path}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    f.writelines(remaining)
+                os.replace(tmp_path, path)
+            else:
+                os.remove(path)
+            with self._lock:
+                self.written += written
+                self.batches += 1
+                self.dead_lettered += len(failed)
+            if remaining:
+                return
+
+    def _save_rows(self, lines, alias):
+        """한 행씩 저장한다. 반환값: (저장한 행 수, 실패한 행, DB 장애로 저장하지 못한 나머지 행)"""
+        written, failed = 0, []
+        for index, line in enumerate(lines):
+            try:
+                with transaction.atomic(using=alias):
+                    chatlog_from_line(line).save(using=alias)
+                written += 1
+            except Exception as e:
+                if not database_available(alias):
+                    logging.error(f"대화 기록 저장 중 DB 연결 실패: {e}")
+                    return written, failed, lines[index:]
+                logging.error(f"저장할 수 없는 대화 기록을 {CHATLOG_DEAD_LETTER} 로 이동: {e}")
+                failed.append(line)
+        return written, failed, []
+
+    def _dead_letter(self, lines):
+        with open(os.path.join(self.spool_dir, CHATLOG_DEAD_LETTER), "a", encoding="utf-8") as f:
+            f.writelines(lines)
+
+    def close(self):
+        """남은 기록을 모두 저장하고 스레드를 종료 (프로세스 종료 시 atexit 으로 호출)"""
+        with self._lock:
+            if self._thread is None or self._closed or self._pid != os.getpid():
+                return
+            self._closed = True
+            self._wakeup.notify()
+        self._thread.join()
+        with self._lock:
+            self._spool.close()
+            if not self._pending:
+                os.remove(self._spool_path())
+
+    def stats(self):
+        with self._lock:
+            return {
+                "enabled": CHATLOG_WRITE_BEHIND,
+                "pending": self._pending,
+                "written": self.written,
+                "batches": self.batches,
+                "dead_lettered": self.dead_lettered,
+            }
+
+
+chatlog_writer = ChatLogWriter()
+
+
+def save_chat_log(user, user_input, chatbot_reply):
+    """대화 저장. write-behind 모드면 스풀에 쓰고 바로 반환한다."""
+    if CHATLOG_WRITE_BEHIND:
+        chatlog_writer.log(user.id, user_input, chatbot_reply)
+    else:
+        ChatLog.objects.create(user=user, user_input=user_input, chatbot_reply=chatbot_reply)
+
+
+async def asave_chat_log(user, user_input, chatbot_reply):
+    if CHATLOG_WRITE_BEHIND:
+        chatlog_writer.log(user.id, user_input, chatbot_reply)
+    else:
+        await ChatLog.objects.acreate(user=user, user_input=user_input, chatbot_reply=chatbot_reply)
@@ -0,0 +1,177 @@
+from langchain.chains.question_answering import load_qa_chain
+from langchain.vectorstores import Chroma
+from langchain.chat_models import ChatOpenAI
+from langchain.prompts import PromptTemplate
+import os
+import asyncio
+import threading
+import time
+import logging
+from src.embedding_cache import get_embeddings
+from .cache_keys import collection_version
+from .keyword_index import KeywordIndex, keyword_index_path, rrf_fuse
+from .semantic_cache import SemanticCache
+
+# ChromaDB 설정
+CHROMADB_DIR = os.getenv("CHROMADB_DIR", "./chroma_db/promotion")
+CHROMADB_COLLECTION = os.getenv("CHROMADB_COLLECTION", "promotion")
+RETRIEVER_K = int(os.getenv("QNA_RETRIEVER_K", 5))
+# 키워드(BM25) 색인이 있으면 벡터 검색과 RRF 로 합친다
+HYBRID_SEARCH = os.getenv("QNA_HYBRID_SEARCH", "True").lower() == "true"
+HYBRID_FETCH_K = int(os.getenv("QNA_HYBRID_FETCH_K", 20))  # 합치기 전 각 검색에서 가져올 후보 수
+
+
+class RAGEngine:
+    """
+    워커 프로세스당 한 번만 생성되는 검색/QA 엔진.
+    Chroma 컬렉션, retriever, LLM 클라이언트, 체인을 열어둔 채로 재사용한다.
+    """
+
+    def __init__(self, persist_directory=CHROMADB_DIR, collection_name=CHROMADB_COLLECTION, k=RETRIEVER_K):
+        started = time.perf_counter()
+        self.persist_directory = persist_directory
+        self.collection_name = collection_name
+
+        # ChromaDB
+        self.embeddings = get_embeddings("text-embedding-3-small")
+        self.db = Chroma(
+            collection_name=collection_name,
+            persist_directory=persist_directory,
+            embedding_function=self.embeddings
+        )
+        self.k = k
+        self.retriever = self.db.as_retriever(search_kwargs={"k": k})
+        self.semantic_cache = SemanticCache()
+        self.keyword_index = None
+        index_path = keyword_index_path(persist_directory, collection_name)
+        if HYBRID_SEARCH and os.path.exists(index_path):
+            self.keyword_index = KeywordIndex(index_path)
+
+        # Chaining
+        self.prompt = PromptTemplate(
+            input_variables=["context", "question"],
+            template="Context: {context}\n\nQuestion: {question}\n\nAnswer: ",
+        )
+        self.llm = ChatOpenAI(model_name="gpt-4o-mini", temperature=0)
+        self.chain = load_qa_chain(
+            llm=self.llm,
+            chain_type="stuff",
+            prompt=self.prompt
+        )
+
+        self.setup_ms = (time.perf_counter() - started) * 1000
+        logging.info(f"RAG 엔진 초기화 완료 ({collection_name}): {self.setup_ms:.1f}ms")
+
+    def embed(self, question):
+        return self.embeddings.embed_query(question)
+
+    def content_version(self):
+        """
+        컬렉션 내용이 바뀌었는지 판단하기 위한 값.
+        명시적으로 올리는 컬렉션 버전과, 적재 프로세스가 쓰는 SQLite 파일(및 WAL)의
+        수정 시각을 함께 사용한다.
+        """
+        version = [collection_version(self.persist_directory, self.collection_name)]
+        for name in ("chroma.sqlite3", "chroma.sqlite3-wal"):
+            try:
+                version.append(os.stat(os.path.join(self.persist_directory, name)).st_mtime_ns)
+            except FileNotFoundError:
+                version.append(None)
+        return tuple(version)
+
+    def retrieve(self, question, vector=None):
+        if self.keyword_index is not None:
+            return self.hybrid_retrieve(question, vector)
+        # 이미 계산된 질문 임베딩이 있으면 다시 임베딩하지 않는다
+        if vector is not None:
+            return self.db.similarity_search_by_vector(vector, k=self.k)
+        return self.retriever.get_relevant_documents(question)
+
+    def hybrid_retrieve(self, question, vector=None):
+        """벡터 검색과 BM25 키워드 검색 결과를 RRF 로 합쳐 상위 k 개를 반환"""
+        if vector is None:
+            vector = self.embed(question)
+        dense = self.db.similarity_search_by_vector(vector, k=HYBRID_FETCH_K)
+        sparse = self.keyword_index.search(question, k=HYBRID_FETCH_K)
+        return rrf_fuse([dense, sparse], self.k)
+
+    def generate(self, documents, question):
+        return self.chain.run(input_documents=documents, question=question)
+
+    async def aembed(self, question):
+        return await self.embeddings.aembed_query(question)
+
+    async def aretrieve(self, question, vector=None):
+        if self.keyword_index is not None:
+            if vector is None:
+                vector = await self.aembed(question)
+            dense = await self.db.asimilarity_search_by_vector(vector, k=HYBRID_FETCH_K)
+            sparse = await asyncio.to_thread(self.keyword_index.search, question, HYBRID_FETCH_K)
+            return rrf_fuse([dense, sparse], self.k)
+        if vector is not None:
+            return await self.db.asimilarity_search_by_vector(vector, k=self.k)
+        return await self.retriever.aget_relevant_documents(question)
+
+    async def agenerate(self, documents, question):
+        return await self.chain.arun(input_documents=documents, question=question)
+
+    def build_prompt(self, documents, question):
+        # "stuff" 체인과 같은 방식으로 문서를 이어 붙인다
+        context = "\n\n".join(doc.page_content for doc in documents)
+        return self.prompt.format(context=context, question=question)
+
+    async def astream(self, documents, question):
+        """LLM 응답 토큰을 생성되는 대로 내보낸다."""
+        async for chunk in self.llm.astream(self.build_prompt(documents, question)):
+            if chunk.content:
+                yield chunk.content
+
+    def answer(self, question, vector=None):
+        """
+        질문에 대한 답변과 단계별 소요 시간(ms)을 반환한다.
+        관련 문서가 없으면 답변은 None.
+        """
+        timings = {}
+        started = time.perf_counter()
+        documents = self.retrieve(question, vector)
+        timings["retrieval"] = (time.perf_counter() - started) * 1000
+        if not documents:
+            return None, timings
+
+        started = time.perf_counter()
+        answer = self.generate(documents, question)
+        timings["llm"] = (time.perf_counter() - started) * 1000
+        return answer, timings
+
+    async def aanswer(self, question, vector=None):
+        """answer 의 비동기 버전 (이벤트 루프를 막지 않는다)"""
+        timings = {}
+        started = time.perf_counter()
+        documents = await self.aretrieve(question, vector)
+        timings["retrieval"] = (time.perf_counter() - started) * 1000
+        if not documents:
+            return None, timings
+
+        started = time.perf_counter()
+        answer = await self.agenerate(documents, question)
+        timings["llm"] = (time.perf_counter() - started) * 1000
+        return answer, timings
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    """프로세스 전역 RAG 엔진을 반환한다. 최초 호출 시 한 번만 생성된다."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = RAGEngine()
+    return _engine
+
+
+def server_timing(timings):
+    """단계별 소요 시간을 Server-Timing 헤더 값으로 변환"""
+    return ", ".join(f"{name};dur={duration:.1f}" for name, duration in timings.items())
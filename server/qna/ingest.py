@@ -0,0 +1,270 @@
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+import chromadb
+import tiktoken
+from src.crawling.csv_encoding import detect_encoding
+from .keyword_index import KeywordIndex, keyword_index_path
+from datetime import datetime, timezone
+import unicodedata
+import hashlib
+import random
+import json
+import csv
+import sys
+import os
+import re
+import time
+import logging
+
+# 크롤러가 만드는 게시판별 CSV
+CSV_DIR = "./data/csv"
+CATEGORY_CSVS = {
+    "notice": os.path.join(CSV_DIR, "mjc_notice.csv"),
+    "academic": os.path.join(CSV_DIR, "mjc_academic.csv"),
+    "scholarship": os.path.join(CSV_DIR, "mjc_scholarship.csv"),
+    "recruitment": os.path.join(CSV_DIR, "mjc_recruitment.csv"),
+    "promotion": os.path.join(CSV_DIR, "mjc_promotion.csv"),
+}
+# 게시판별 컬렉션은 ./chroma_db/<category> 의 <category> 컬렉션에 둔다
+CHROMA_BASE_DIR = "./chroma_db"
+
+# 게시물 본문(context)이 수천 자라 기본 필드 크기 제한을 늘린다
+csv.field_size_limit(sys.maxsize)
+
+
+def category_from_path(path):
+    """data/csv/mjc_<category>.csv 에서 카테고리 이름을 얻는다."""
+    name = os.path.splitext(os.path.basename(path))[0]
+    return name[len("mjc_"):] if name.startswith("mjc_") else name
+
+
+def read_rows(path, category=None):
+    """CSV 를 한 행씩 읽어 title/context/date/link/category/source/hash 딕셔너리로 내보낸다."""
+    category = category or category_from_path(path)
+    source = os.path.basename(path)
+    with open(path, "r", encoding=detect_encoding(path), newline="") as f:
+        for row in csv.DictReader(f):
+            if not row.get("context"):
+                continue
+            link = row.get("link") or ""
+            yield {
+                "title": row.get("title") or "",
+                "context": row["context"],
+                "date": row.get("date") or "",
+                "link": link,
+                "category": row.get("category") or category,
+                "source": source,
+                "hash": content_hash(link, row["context"]),
+            }
+
+
+def content_hash(link, context):
+    """게시물의 안정적인 내용 해시 (link + 공백을 정규화한 본문)"""
+    normalized = re.sub(r"\s+", " ", unicodedata.normalize("NFKC", context)).strip()
+    return hashlib.sha256(f"{link}\x00{normalized}".encode("utf-8")).hexdigest()
+
+
+def chunk_ids(post_hash, count):
+    return [f"{post_hash}-{index}" for index in range(count)]
+
+
+def chunk_rows(rows, splitter, on_post=None):
+    """게시물 본문을 청크로 나누고 (id, text, metadata) 를 내보낸다."""
+    for row in rows:
+        chunks = splitter.split_text(row["context"])
+        if on_post:
+            on_post(row, len(chunks))
+        for index, text in enumerate(chunks):
+            metadata = {
+                "title": row["title"],
+                "date": row["date"],
+                "link": row["link"],
+                "category": row["category"],
+                "chunk": index,
+                "content_hash": row["hash"],
+            }
+            yield f"{row['hash']}-{index}", text, metadata
+
+
+def manifest_path_for(persist_directory, collection_name):
+    return os.path.join(persist_directory, f"{collection_name}.manifest.json")
+
+
+def load_manifest(path):
+    """{content_hash: {"link", "source", "chunks", "indexed_at"}}"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(path, manifest):
+    # 중간에 중단되어도 기존 매니페스트가 깨지지 않도록 임시 파일에 쓰고 교체
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, path)
+
+
+def collection_ids(collection, page_size=1000):
+    """컬렉션의 모든 문서 ID (임베딩/본문 없이 페이지 단위로 읽는다)"""
+    ids, offset = [], 0
+    while True:
+        page = collection.get(include=[], limit=page_size, offset=offset)["ids"]
+        if not page:
+            return ids
+        ids.extend(page)
+        offset += len(page)
+
+
+def token_counter():
+    """임베딩 모델과 같은 토크나이저로 토큰 수를 센다. 인코딩을 받을 수 없으면 글자 수로 추정."""
+    try:
+        encoding = tiktoken.get_encoding("cl100k_base")
+        return lambda text: len(encoding.encode(text))
+    except Exception as e:
+        logging.warning(f"tiktoken 인코딩을 불러오지 못해 글자 수로 토큰을 추정합니다: {e}")
+        return len
+
+
+def embed_with_retry(embeddings, texts, max_retries=5, backoff=1.0):
+    """임베딩 API 오류(레이트 리밋 등) 시 지수 백오프로 재시도"""
+    for attempt in range(max_retries + 1):
+        try:
+            return embeddings.embed_documents(texts)
+        except Exception as e:
+            if attempt == max_retries:
+                raise
+            delay = backoff * (2 ** attempt) + random.uniform(0, backoff)
+            logging.warning(f"임베딩 실패 ({e}), {delay:.1f}초 후 재시도 ({attempt + 1}/{max_retries})")
+            time.sleep(delay)
+
+
+class IngestStats:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.rows = 0
+        self.new_posts = 0
+        self.unchanged_posts = 0
+        self.deleted_posts = 0
+        self.deleted_orphans = 0
+        self.chunks = 0
+        self.tokens = 0
+
+    @property
+    def changed(self):
+        return bool(self.new_posts or self.deleted_posts or self.deleted_orphans)
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def report(self):
+        elapsed = self.elapsed or 1e-9
+        return (
+            f"rows={self.rows} new={self.new_posts} unchanged={self.unchanged_posts} deleted={self.deleted_posts} "
+            f"orphans={self.deleted_orphans} "
+            f"chunks={self.chunks} tokens={self.tokens} "
+            f"elapsed={self.elapsed:.1f}s rows/s={self.rows / elapsed:.1f} tokens/s={self.tokens / elapsed:.0f}"
+        )
+
+
+def ingest_csv(paths, persist_directory, collection_name, embeddings,
+               batch_size=256, concurrency=4, chunk_size=1000, chunk_overlap=100,
+               max_retries=5, category=None, progress=None, full=False):
+    """
+    CSV 를 스트리밍으로 읽어 청크 단위로 큰 배치 임베딩을 병렬 수행하고 Chroma 에 일괄 upsert 한다.
+    문서 ID 는 게시물 내용 해시이므로, 매니페스트에 없는 새 게시물/수정된 게시물만 임베딩하고
+    이번 원본 파일에서 사라진 게시물은 컬렉션에서 삭제한다. full=True 면 모두 다시 임베딩한다.
+    매니페스트가 없거나 full=True 면 매니페스트에 없는 청크(매니페스트 이전에 적재된 청크 등)를
+    컬렉션과 키워드 색인에서 모두 지운다.
+    """
+    splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    count_tokens = token_counter()
+    client = chromadb.PersistentClient(path=persist_directory)
+    collection = client.get_or_create_collection(collection_name)
+    # BM25 키워드 색인도 같은 청크 ID 로 함께 갱신
+    keyword_index = KeywordIndex(keyword_index_path(persist_directory, collection_name))
+    manifest_path = manifest_path_for(persist_directory, collection_name)
+    # 매니페스트가 없으면 컬렉션의 기존 청크가 원본과 맞는지 알 수 없으므로 끝나고 전체를 비교한다
+    sweep = full or not os.path.exists(manifest_path)
+    manifest = load_manifest(manifest_path)
+    indexed_at = datetime.now(timezone.utc).isoformat()
+    seen = set()
+    stats = IngestStats()
+
+    def rows():
+        for path in paths:
+            for row in read_rows(path, category):
+                stats.rows += 1
+                if row["hash"] in seen:
+                    continue  # 여러 파일에 같은 게시물이 있는 경우
+                seen.add(row["hash"])
+                if not full and row["hash"] in manifest:
+                    stats.unchanged_posts += 1
+                    continue
+                stats.new_posts += 1
+                yield row
+
+    def on_post(row, chunk_count):
+        manifest[row["hash"]] = {
+            "link": row["link"],
+            "source": row["source"],
+            "chunks": chunk_count,
+            "indexed_at": indexed_at,
+        }
+
+    def embed(batch):
+        ids, texts, metadatas = zip(*batch)
+        vectors = embed_with_retry(embeddings, list(texts), max_retries)
+        return list(ids), list(texts), list(metadatas), vectors
+
+    def upsert(future):
+        ids, texts, metadatas, vectors = future.result()
+        collection.upsert(ids=ids, embeddings=vectors, documents=texts, metadatas=metadatas)
+        keyword_index.add(ids, texts, metadatas)
+        stats.chunks += len(ids)
+        stats.tokens += sum(count_tokens(text) for text in texts)
+        if progress:
+            progress(stats)
+
+    # 동시에 진행 중인 배치 수를 제한해 메모리를 일정하게 유지
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        pending = set()
+        batch = []
+        for item in chunk_rows(rows(), splitter, on_post):
+            batch.append(item)
+            if len(batch) < batch_size:
+                continue
+            pending.add(executor.submit(embed, batch))
+            batch = []
+            if len(pending) >= concurrency * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    upsert(future)
+        if batch:
+            pending.add(executor.submit(embed, batch))
+        for future in pending:
+            upsert(future)
+
+    # 이번에 읽은 원본 파일에서 사라진(또는 내용이 바뀐) 게시물 삭제
+    sources = {os.path.basename(path) for path in paths}
+    stale = [h for h, entry in manifest.items() if entry["source"] in sources and h not in seen]
+    for post_hash in stale:
+        ids = chunk_ids(post_hash, manifest.pop(post_hash)["chunks"])
+        collection.delete(ids=ids)
+        keyword_index.delete(ids)
+        stats.deleted_posts += 1
+
+    if sweep:
+        expected = {chunk_id for h, entry in manifest.items() for chunk_id in chunk_ids(h, entry["chunks"])}
+        orphans = [chunk_id for chunk_id in collection_ids(collection) if chunk_id not in expected]
+        for start in range(0, len(orphans), batch_size):
+            collection.delete(ids=orphans[start:start + batch_size])
+        keyword_index.delete([chunk_id for chunk_id in keyword_index.ids() if chunk_id not in expected])
+        stats.deleted_orphans = len(orphans)
+        if orphans:
+            logging.info(f"매니페스트에 없는 청크 {len(orphans)}개 삭제 ({collection_name})")
+
+    save_manifest(manifest_path, manifest)
+    return stats
@@ -0,0 +1,177 @@
+import os
+import re
+import json
+import math
+import sqlite3
+import threading
+import unicodedata
+from collections import Counter
+from langchain.schema import Document
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+RRF_K = int(os.getenv("QNA_RRF_K", 60))
+
+WORD_RE = re.compile(r"\w+")
+# 한 단어 안에서도 한글 / 그 밖의 글자(숫자, 영문 등) 구간을 나눈다. 예) "2024학년도" -> "2024", "학년도"
+SCRIPT_RUN_RE = re.compile(r"[가-힣]+|[^가-힣]+")
+# SQLite 변수 개수 제한에 걸리지 않도록 쿼리 단어 수를 제한
+MAX_QUERY_TERMS = 200
+
+
+def tokenize(text):
+    """
+    한국어는 조사/어미가 붙어도 매칭되도록 글자 bigram 으로, 숫자/영문 구간은 그대로 나눈다.
+    예) "2024학년도 장학금 신청기간" -> ["2024", "학년", "년도", "장학", "학금", "신청", "청기", "기간"]
+    """
+    tokens = []
+    for word in WORD_RE.findall(unicodedata.normalize("NFKC", text).lower()):
+        for run in SCRIPT_RUN_RE.findall(word):
+            if "가" <= run[0] <= "힣" and len(run) > 1:
+                tokens.extend(run[index:index + 2] for index in range(len(run) - 1))
+            else:
+                tokens.append(run)
+    return tokens
+
+
+def keyword_index_path(persist_directory, collection_name):
+    return os.path.join(persist_directory, f"{collection_name}.bm25.sqlite3")
+
+
+def doc_key(doc):
+    """적재 시 붙인 청크 ID (content_hash-chunk), 없으면 본문으로 문서를 식별"""
+    metadata = doc.metadata or {}
+    if "content_hash" in metadata and "chunk" in metadata:
+        return f"{metadata['content_hash']}-{metadata['chunk']}"
+    return doc.page_content
+
+
+def rrf_fuse(result_lists, k, rrf_k=RRF_K):
+    """Reciprocal Rank Fusion: 여러 검색 결과의 순위를 1/(rrf_k + rank) 로 합산"""
+    scores, documents = {}, {}
+    for results in result_lists:
+        for rank, doc in enumerate(results, start=1):
+            key = doc_key(doc)
+            scores[key] = scores.get(key, 0.0) + 1.0 / (rrf_k + rank)
+            documents.setdefault(key, doc)
+    ranked = sorted(scores, key=scores.get, reverse=True)
+    return [documents[key] for key in ranked[:k]]
+
+
+class KeywordIndex:
+    """
+    SQLite 에 저장되는 BM25 역색인.
+    적재(ingest_csv) 시 Chroma 와 같은 청크 ID 로 추가/삭제되고, 점수 계산은 SQLite 안에서 한다.
+    """
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.executescript("""
+            PRAGMA journal_mode=WAL;
+            CREATE TABLE IF NOT EXISTS docs (id TEXT PRIMARY KEY, length INTEGER, content TEXT, metadata TEXT);
+            CREATE TABLE IF NOT EXISTS terms (term TEXT PRIMARY KEY, df INTEGER) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS postings (
+                term TEXT, doc_id TEXT, tf INTEGER, PRIMARY KEY (term, doc_id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS postings_doc ON postings (doc_id);
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER);
+            INSERT OR IGNORE INTO meta VALUES ('doc_count', 0), ('total_length', 0);
+        """)
+        self._conn.commit()
+
+    def _delete(self, doc_id):
+        row = self._conn.execute("SELECT length FROM docs WHERE id = ?", (doc_id,)).fetchone()
+        if row is None:
+            return
+        self._conn.execute(
+            "UPDATE terms SET df = df - 1 WHERE term IN (SELECT term FROM postings WHERE doc_id = ?)", (doc_id,)
+        )
+        self._conn.execute("DELETE FROM postings WHERE doc_id = ?", (doc_id,))
+        self._conn.execute("DELETE FROM docs WHERE id = ?", (doc_id,))
+        self._conn.execute("UPDATE meta SET value = value - 1 WHERE key = 'doc_count'")
+        self._conn.execute("UPDATE meta SET value = value - ? WHERE key = 'total_length'", (row[0],))
+
+    def add(self, ids, texts, metadatas):
+        """청크를 추가한다. 같은 ID 가 있으면 교체."""
+        with self._lock, self._conn:
+            for doc_id, text, metadata in zip(ids, texts, metadatas):
+                self._delete(doc_id)
+                counts = Counter(tokenize(text))
+                length = sum(counts.values())
+                self._conn.execute(
+                    "INSERT INTO docs (id, length, content, metadata) VALUES (?, ?, ?, ?)",
+                    (doc_id, length, text, json.dumps(metadata, ensure_ascii=False))
+                )
+                self._conn.executemany(
+                    "INSERT INTO postings (term, doc_id, tf) VALUES (?, ?, ?)",
+                    [(term, doc_id, tf) for term, tf in counts.items()]
+                )
+                self._conn.executemany(
+                    "INSERT INTO terms (term, df) VALUES (?, 1) ON CONFLICT(term) DO UPDATE SET df = df + 1",
+                    [(term,) for term in counts]
+                )
+                self._conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'doc_count'")
+                self._conn.execute("UPDATE meta SET value = value + ? WHERE key = 'total_length'", (length,))
+            self._conn.execute("DELETE FROM terms WHERE df <= 0")
+
+    def delete(self, ids):
+        with self._lock, self._conn:
+            for doc_id in ids:
+                self._delete(doc_id)
+            self._conn.execute("DELETE FROM terms WHERE df <= 0")
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT value FROM meta WHERE key = 'doc_count'").fetchone()[0]
+
+    def ids(self):
+        with self._lock:
+            return [doc_id for (doc_id,) in self._conn.execute("SELECT id FROM docs")]
+
+    def metadatas(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT metadata FROM docs").fetchall()
+        return [json.loads(metadata) for (metadata,) in rows]
+
+    def search(self, query, k=5):
+        """BM25 점수 상위 k 개 청크를 Document 로 반환 (metadata 에 bm25 점수 포함)"""
+        query_terms = Counter(tokenize(query)).most_common(MAX_QUERY_TERMS)
+        if not query_terms:
+            return []
+        with self._lock:
+            meta = dict(self._conn.execute("SELECT key, value FROM meta"))
+            doc_count = meta["doc_count"]
+            if not doc_count:
+                return []
+            average_length = meta["total_length"] / doc_count
+
+            placeholders = ",".join("?" * len(query_terms))
+            df = dict(self._conn.execute(
+                f"SELECT term, df FROM terms WHERE term IN ({placeholders})", [term for term, _ in query_terms]
+            ))
+            weights = [
+                (term, count * math.log(1 + (doc_count - df[term] + 0.5) / (df[term] + 0.5)))
+                for term, count in query_terms if term in df
+            ]
+            if not weights:
+                return []
+
+            values = ",".join("(?, ?)" for _ in weights)
+            rows = self._conn.execute(f"""
+                WITH q(term, weight) AS (VALUES {values})
+                SELECT d.id, d.content, d.metadata, SUM(
+                    q.weight * p.tf * {BM25_K1 + 1} / (p.tf + {BM25_K1} * (1 - {BM25_B} + {BM25_B} * d.length / ?))
+                ) AS score
+                FROM q JOIN postings p ON p.term = q.term JOIN docs d ON d.id = p.doc_id
+                GROUP BY d.id ORDER BY score DESC LIMIT ?
+            """, [value for weight in weights for value in weight] + [average_length, k]).fetchall()
+
+        documents = []
+        for doc_id, content, metadata, score in rows:
+            metadata = json.loads(metadata)
+            metadata["bm25"] = score
+            documents.append(Document(page_content=content, metadata=metadata))
+        return documents
@@ -0,0 +1,61 @@
+import time
+import random
+import statistics
+from django.core.management.base import BaseCommand
+from qna.engine import RAGEngine, CHROMADB_DIR, CHROMADB_COLLECTION, HYBRID_FETCH_K
+from qna.keyword_index import KeywordIndex, keyword_index_path, rrf_fuse
+
+
+class Command(BaseCommand):
+    help = "벡터 검색만 사용할 때와 BM25+벡터(RRF) 하이브리드 검색의 지연 시간과 recall@k 를 비교합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--persist-dir", default=CHROMADB_DIR)
+        parser.add_argument("--collection", default=CHROMADB_COLLECTION)
+        parser.add_argument("--samples", type=int, default=100)
+        parser.add_argument("--k", type=int, default=5)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        k = options["k"]
+        engine = RAGEngine(options["persist_dir"], options["collection"], k=k)
+        index = KeywordIndex(keyword_index_path(options["persist_dir"], options["collection"]))
+
+        # 게시물 제목을 질문으로 사용하고, 같은 게시물의 청크가 상위 k 안에 있으면 정답으로 본다
+        posts = {}
+        for metadata in index.metadatas():
+            if metadata.get("title") and metadata.get("content_hash"):
+                posts[metadata["content_hash"]] = metadata["title"]
+        samples = random.Random(options["seed"]).sample(sorted(posts.items()), min(options["samples"], len(posts)))
+        if not samples:
+            self.stdout.write(self.style.ERROR("제목/content_hash 메타데이터가 있는 청크가 없습니다."))
+            return
+
+        results = {"dense": ([], 0), "hybrid": ([], 0)}
+        for content_hash, title in samples:
+            vector = engine.embed(title)  # 임베딩 시간은 두 방식 모두 같으므로 제외
+
+            started = time.perf_counter()
+            dense = engine.db.similarity_search_by_vector(vector, k=k)
+            dense_ms = (time.perf_counter() - started) * 1000
+
+            started = time.perf_counter()
+            hybrid = rrf_fuse([
+                engine.db.similarity_search_by_vector(vector, k=HYBRID_FETCH_K),
+                index.search(title, k=HYBRID_FETCH_K),
+            ], k)
+            hybrid_ms = (time.perf_counter() - started) * 1000
+
+            for name, documents, elapsed in (("dense", dense, dense_ms), ("hybrid", hybrid, hybrid_ms)):
+                latencies, hits = results[name]
+                latencies.append(elapsed)
+                found = any(doc.metadata.get("content_hash") == content_hash for doc in documents)
+                results[name] = (latencies, hits + found)
+
+        self.stdout.write(f"질문 {len(samples)}개, k={k}")
+        for name, (latencies, hits) in results.items():
+            p95 = sorted(latencies)[int(len(latencies) * 0.95) - 1] if len(latencies) > 1 else latencies[0]
+            self.stdout.write(
+                f"{name:<7} recall@{k}={hits / len(samples):.3f} "
+                f"latency mean={statistics.mean(latencies):.1f}ms p95={p95:.1f}ms"
+            )
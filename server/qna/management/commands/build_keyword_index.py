@@ -0,0 +1,32 @@
+import chromadb
+from django.core.management.base import BaseCommand
+from qna.engine import CHROMADB_DIR, CHROMADB_COLLECTION
+from qna.keyword_index import KeywordIndex, keyword_index_path
+
+
+class Command(BaseCommand):
+    help = "기존 Chroma 컬렉션의 청크로 BM25 키워드 색인을 만듭니다. (이후에는 ingest_csv 가 함께 갱신)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--persist-dir", default=CHROMADB_DIR)
+        parser.add_argument("--collection", default=CHROMADB_COLLECTION)
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        collection_name = options["collection"]
+        client = chromadb.PersistentClient(path=options["persist_dir"])
+        collection = client.get_collection(collection_name)
+        index = KeywordIndex(keyword_index_path(options["persist_dir"], collection_name))
+
+        offset = 0
+        while True:
+            batch = collection.get(
+                limit=options["batch_size"], offset=offset, include=["documents", "metadatas"]
+            )
+            if not batch["ids"]:
+                break
+            index.add(batch["ids"], batch["documents"], [metadata or {} for metadata in batch["metadatas"]])
+            offset += len(batch["ids"])
+            self.stdout.write(f"{offset}개 청크 색인")
+
+        self.stdout.write(self.style.SUCCESS(f"키워드 색인 완료 ({collection_name}): {len(index)}개 청크"))
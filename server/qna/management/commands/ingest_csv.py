@@ -0,0 +1,69 @@
+import os
+from django.core.management.base import BaseCommand, CommandError
+from src.embedding_cache import get_embeddings
+from qna.cache_keys import bump_collection_version
+from qna.engine import CHROMADB_DIR, CHROMADB_COLLECTION
+from qna.ingest import CATEGORY_CSVS, CHROMA_BASE_DIR, category_from_path, ingest_csv
+
+
+class Command(BaseCommand):
+    help = (
+        "크롤링한 CSV 중 새로 추가/변경된 게시물만 청크로 나누고 배치 임베딩하여 Chroma 컬렉션에 적재합니다. "
+        "경로를 주지 않으면 컬렉션과 같은 이름의 게시판 CSV 를 적재합니다."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("paths", nargs="*", help="적재할 CSV 경로 (기본: 컬렉션과 같은 게시판의 CSV)")
+        parser.add_argument("--persist-dir", help="기본: 서비스 컬렉션이면 CHROMADB_DIR, 아니면 ./chroma_db/<collection>")
+        parser.add_argument("--collection", help=f"기본: {CHROMADB_COLLECTION}")
+        parser.add_argument("--category", help="CSV 에 category 열이 없을 때 사용할 카테고리 (기본: 파일 이름)")
+        parser.add_argument("--model", default="text-embedding-3-small")
+        parser.add_argument("--batch-size", type=int, default=256)
+        parser.add_argument("--concurrency", type=int, default=4)
+        parser.add_argument("--chunk-size", type=int, default=1000)
+        parser.add_argument("--chunk-overlap", type=int, default=100)
+        parser.add_argument("--max-retries", type=int, default=5)
+        parser.add_argument("--full", action="store_true", help="매니페스트를 무시하고 모두 다시 임베딩")
+
+    def handle(self, *args, **options):
+        collection = options["collection"] or CHROMADB_COLLECTION
+        persist_dir = options["persist_dir"] or (
+            CHROMADB_DIR if collection == CHROMADB_COLLECTION else os.path.join(CHROMA_BASE_DIR, collection)
+        )
+        paths = options["paths"]
+        if not paths:
+            if collection not in CATEGORY_CSVS:
+                raise CommandError(f"'{collection}' 컬렉션에 적재할 CSV 경로를 지정해주세요.")
+            paths = [CATEGORY_CSVS[collection]]
+        elif not options["collection"] and collection in CATEGORY_CSVS:
+            # 다른 게시판 CSV 가 기본(서비스) 컬렉션에 섞이지 않도록 한다
+            other = sorted({options["category"] or category_from_path(path) for path in paths} - {collection})
+            if other:
+                raise CommandError(
+                    f"{', '.join(other)} CSV 를 '{collection}' 컬렉션에 적재하려면 --collection 을 명시해주세요."
+                )
+
+        def progress(stats):
+            self.stdout.write(stats.report())
+
+        embeddings = get_embeddings(options["model"])
+        stats = ingest_csv(
+            paths,
+            persist_directory=persist_dir,
+            collection_name=collection,
+            embeddings=embeddings,
+            batch_size=options["batch_size"],
+            concurrency=options["concurrency"],
+            chunk_size=options["chunk_size"],
+            chunk_overlap=options["chunk_overlap"],
+            max_retries=options["max_retries"],
+            category=options["category"],
+            progress=progress,
+            full=options["full"],
+        )
+
+        # 내용이 바뀐 경우에만 캐시된 답변 무효화
+        if stats.changed:
+            bump_collection_version(persist_dir, collection)
+        self.stdout.write(f"임베딩 캐시: {embeddings.stats()}")
+        self.stdout.write(self.style.SUCCESS(f"적재 완료 ({collection}): {stats.report()}"))
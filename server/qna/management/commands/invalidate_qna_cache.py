@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from qna.cache_keys import bump_collection_version
+from qna.engine import CHROMADB_DIR, CHROMADB_COLLECTION
+
+
+class Command(BaseCommand):
+    help = "컬렉션 내용 버전을 올려 캐시된 Q&A 답변을 즉시 무효화합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--persist-dir", default=CHROMADB_DIR)
+        parser.add_argument("--collection", default=CHROMADB_COLLECTION)
+
+    def handle(self, *args, **options):
+        collection = options["collection"]
+        version = bump_collection_version(options["persist_dir"], collection)
+        self.stdout.write(self.style.SUCCESS(f"'{collection}' 컬렉션 버전: {version}"))
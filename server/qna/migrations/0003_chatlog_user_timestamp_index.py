@@ -0,0 +1,18 @@
+# Generated by Django 5.1.3 on 2026-10-18 19:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_alter_user_id'),
+        ('qna', '0002_alter_chatlog_id'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='chatlog',
+            index=models.Index(fields=['user', 'timestamp'], name='qna_chatlog_user_ts_idx'),
+        ),
+    ]
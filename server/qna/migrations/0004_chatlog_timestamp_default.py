@@ -0,0 +1,19 @@
+# Generated by Django 5.1.3 on 2026-10-18 19:31
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('qna', '0003_chatlog_user_timestamp_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='chatlog',
+            name='timestamp',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
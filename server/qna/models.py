@@ -1,11 +1,19 @@
 from django.db import models
+from django.utils import timezone
 from accounts.models import User
 
 class ChatLog(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     user_input = models.TextField()
     chatbot_reply = models.TextField()
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # write-behind 모드에서는 저장이 늦어지므로 대화 시각을 직접 넣을 수 있어야 한다
+    timestamp = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            # 사용자별 대화 기록 조회/커서 페이지네이션용
+            models.Index(fields=['user', 'timestamp'], name='qna_chatlog_user_ts_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.user_input[:30]}"
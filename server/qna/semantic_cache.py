@@ -0,0 +1,98 @@
+import os
+import time
+import threading
+import numpy as np
+
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("QNA_SEMANTIC_CACHE_THRESHOLD", 0.95))
+SEMANTIC_CACHE_TTL = float(os.getenv("QNA_SEMANTIC_CACHE_TTL", 300))  # 초
+SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("QNA_SEMANTIC_CACHE_MAX_ENTRIES", 1000))
+
+
+class SemanticCache:
+    """
+    최근 답변한 질문의 임베딩을 메모리에 보관하고,
+    코사인 유사도가 임계값을 넘는 질문이 들어오면 저장된 답변을 돌려준다.
+    """
+
+    def __init__(self, threshold=SEMANTIC_CACHE_THRESHOLD, ttl=SEMANTIC_CACHE_TTL, max_entries=SEMANTIC_CACHE_MAX_ENTRIES):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._vectors = []   # 정규화된 질문 임베딩
+        self._entries = []   # (question, answer, created_at)
+        self._matrix = None
+        self._version = None
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _normalize(vector):
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _sync_version(self, version):
+        # 컬렉션이 다시 적재되었으면 저장된 답변을 모두 버린다
+        if version != self._version:
+            self._clear()
+            self._version = version
+
+    def _clear(self):
+        self._vectors = []
+        self._entries = []
+        self._matrix = None
+
+    def _expire(self, now):
+        keep = [i for i, (_, _, created) in enumerate(self._entries) if now - created <= self.ttl]
+        if len(keep) != len(self._entries):
+            self._vectors = [self._vectors[i] for i in keep]
+            self._entries = [self._entries[i] for i in keep]
+            self._matrix = None
+
+    def get(self, vector, version=None):
+        """유사한 질문의 답변과 유사도를 반환. 없으면 (None, 최고 유사도)."""
+        query = self._normalize(vector)
+        with self._lock:
+            self._sync_version(version)
+            self._expire(time.monotonic())
+            if not self._entries:
+                self.misses += 1
+                return None, 0.0
+            if self._matrix is None:
+                self._matrix = np.vstack(self._vectors)
+            scores = self._matrix @ query
+            best = int(np.argmax(scores))
+            score = float(scores[best])
+            if score >= self.threshold:
+                self.hits += 1
+                return self._entries[best][1], score
+            self.misses += 1
+            return None, score
+
+    def set(self, vector, question, answer, version=None):
+        with self._lock:
+            self._sync_version(version)
+            self._vectors.append(self._normalize(vector))
+            self._entries.append((question, answer, time.monotonic()))
+            # 오래된 항목부터 제거
+            overflow = len(self._entries) - self.max_entries
+            if overflow > 0:
+                del self._vectors[:overflow]
+                del self._entries[:overflow]
+            self._matrix = None
+
+    def invalidate(self):
+        with self._lock:
+            self._clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "threshold": self.threshold,
+            }
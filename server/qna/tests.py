@@ -1,3 +1,112 @@
-from django.test import TestCase
+import json
+import shutil
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
-# Create your tests here.
+from django.test import SimpleTestCase
+
+from src.crawling.ocr import OCRStage, http_backend
+
+
+class CountingBackend:
+    """호출 횟수를 세는 OCR 백엔드 대역"""
+
+    def __init__(self):
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, img_path):
+        with self._lock:
+            self.calls += 1
+        with open(img_path, "rb") as f:
+            return [f"page of {len(f.read())} bytes"]
+
+
+class OCRStageTestCase(SimpleTestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.cache_dir = f"{self.tmp_dir}/cache"
+        self.backend = CountingBackend()
+
+    def write_image(self, name, data):
+        path = f"{self.tmp_dir}/{name}"
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def stage(self):
+        stage = OCRStage(backend=self.backend, cache_dir=self.cache_dir, workers=2)
+        self.addCleanup(stage.shutdown)
+        return stage
+
+
+class OCRCacheTests(OCRStageTestCase):
+    def test_same_bytes_are_recognized_once(self):
+        # 파일 이름이 달라도 바이트가 같으면 같은 캐시 항목
+        first = self.write_image("a.png", b"image-bytes")
+        second = self.write_image("b.png", b"image-bytes")
+        stage = self.stage()
+        pages = stage.submit(first).result()
+        self.assertEqual(stage.submit(second).result(), pages)
+        self.assertEqual(self.backend.calls, 1)
+        self.assertEqual(stage.stats()["misses"], 1)
+        self.assertEqual(stage.stats()["hits"], 1)
+
+    def test_cache_survives_new_stage(self):
+        path = self.write_image("a.png", b"image-bytes")
+        pages = self.stage().submit(path).result()
+        stage = self.stage()
+        self.assertEqual(stage.submit(path).result(), pages)
+        self.assertEqual(self.backend.calls, 1)
+        self.assertEqual(stage.stats(), {"hits": 1, "misses": 0, "hit_rate": 1.0})
+
+    def test_changed_bytes_miss(self):
+        path = self.write_image("a.png", b"image-bytes")
+        stage = self.stage()
+        stage.submit(path).result()
+        self.write_image("a.png", b"other-image-bytes")
+        self.assertEqual(stage.submit(path).result(), ["page of 17 bytes"])
+        self.assertEqual(self.backend.calls, 2)
+
+
+class StubOCRHandler(BaseHTTPRequestHandler):
+    """본문에 "single" 이 있으면 {"text"}, 아니면 {"pages"} 로 답하는 OCR 서비스 대역"""
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.requests += 1
+        data = {"text": "single"} if b"single" in body else {"pages": ["page1", "page2"]}
+        payload = json.dumps(data).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+class HTTPBackendTests(OCRStageTestCase):
+    def setUp(self):
+        super().setUp()
+        server = ThreadingHTTPServer(("127.0.0.1", 0), StubOCRHandler)
+        server.requests = 0
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.server = server
+        self.backend = http_backend(f"http://127.0.0.1:{server.server_port}/")
+
+    def test_cached_image_is_not_sent_again(self):
+        path = self.write_image("a.png", b"image-bytes")
+        stage = self.stage()
+        self.assertEqual(stage.submit(path).result(), ["page1", "page2"])
+        self.assertEqual(stage.submit(path).result(), ["page1", "page2"])
+        self.assertEqual(self.server.requests, 1)
+
+    def test_text_response_is_one_page(self):
+        path = self.write_image("a.png", b"single-page")
+        self.assertEqual(self.stage().submit(path).result(), ["single"])
@@ -3,6 +3,9 @@ from . import views
 
 urlpatterns = [
     path('', views.qna, name='qna'),  # '/qna/'를 처리하는 뷰
+    path('async/', views.qna_async, name='qna_async'),  # 비동기 버전 (ASGI)
+    path('stream/', views.qna_stream, name='qna_stream'),  # SSE 스트리밍 (ASGI)
     path('get_chat_history/', views.get_chat_history, name='get_chat_history'),
     path('save_chat/', views.save_chat, name='save_chat'),
+    path('cache_stats/', views.cache_stats, name='cache_stats'),
 ]
@@ -1,99 +1,244 @@
 from django.core.cache import cache  # 캐싱을 위한 모듈 추가
-from django.contrib.sessions.backends.db import SessionStore
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
-from django.contrib.sessions.models import Session
-from langchain.chains.question_answering import load_qa_chain
-from langchain.vectorstores import Chroma
-from langchain.embeddings.openai import OpenAIEmbeddings
-from langchain.chat_models import ChatOpenAI
-from langchain.prompts import PromptTemplate
+from django.db.models import Q
+from .cache_keys import answer_cache_key
+from .chatlog_writer import chatlog_writer, save_chat_log, asave_chat_log
+from .engine import get_engine, server_timing
 from .models import ChatLog
+from accounts.auth import InvalidSession, get_session_user, aget_session_user
 from accounts.models import User
+from datetime import datetime
+import base64
 import json
-import os
+import time
 import logging
 
 logging.basicConfig(level=logging.DEBUG)
 
-# ChromaDB 설정
-CHROMADB_DIR = os.getenv("CHROMADB_DIR", "./chroma_db/promotion")
-CHROMADB_COLLECTION = os.getenv("CHROMADB_COLLECTION", "promotion")
+
+def parse_question(request):
+    """Q&A 요청 본문에서 (question, session_id) 를 꺼낸다. 잘못된 요청이면 세 번째 값으로 오류 응답을 준다."""
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return None, None, JsonResponse({"error": "잘못된 요청입니다."}, status=400)
+    question = data.get("question")
+    session_id = data.get("session_id")
+    if not question or not session_id:
+        return None, None, JsonResponse({"error": "질문과 세션 ID를 입력해주세요."}, status=400)
+    return question, session_id, None
+
+
+def session_error(error):
+    """세션 검증 중 발생한 예외(InvalidSession / User.DoesNotExist)를 응답으로 변환"""
+    if isinstance(error, InvalidSession):
+        return JsonResponse({"error": "유효하지 않은 세션 ID입니다."}, status=401)
+    return JsonResponse({"error": "사용자를 찾을 수 없습니다."}, status=404)
+
+
+def answer_key(engine, question):
+    """정규화된 질문 + 컬렉션 + 내용 버전으로 (버전, 답변 캐시 키)"""
+    version = engine.content_version()
+    return version, answer_cache_key(question, engine.collection_name, version)
+
+
+def semantic_answer(engine, vector, version):
+    """의미 기반 캐시에서 비슷한 질문의 답변을 찾는다"""
+    cached_answer, score = engine.semantic_cache.get(vector, version)
+    if cached_answer:
+        logging.info(f"의미 캐시 응답 반환 (유사도 {score:.3f}): {cached_answer}")
+    return cached_answer
+
+
+def remember_answer(engine, cache_key, vector, question, answer, version):
+    cache.set(cache_key, answer, timeout=300)
+    engine.semantic_cache.set(vector, question, answer, version)
+
+
+async def aremember_answer(engine, cache_key, vector, question, answer, version):
+    await cache.aset(cache_key, answer, timeout=300)
+    engine.semantic_cache.set(vector, question, answer, version)
+
+
+def timed_answer_response(answer, timings, started):
+    timings["total"] = (time.perf_counter() - started) * 1000
+    logging.info(f"Q&A 처리 시간(ms): {timings}")
+    response = JsonResponse({"answer": answer}, status=200)
+    response["Server-Timing"] = server_timing(timings)
+    return response
 
 
 @csrf_exempt
 def qna(request):
-    if request.method == 'POST':
+    if request.method != 'POST':
+        return JsonResponse({"error": "잘못된 요청입니다."}, status=400)
+
+    try:
+        started = time.perf_counter()
+        question, session_id, error = parse_question(request)
+        if error:
+            return error
+
+        # 세션 검증 및 사용자 가져오기
         try:
-            data = json.loads(request.body)
-            question = data.get("question")
-            session_id = data.get("session_id")
+            user = get_session_user(session_id)
+        except (InvalidSession, User.DoesNotExist) as e:
+            return session_error(e)
+
+        # 캐시에서 확인 (정규화된 질문 + 컬렉션 + 내용 버전 키)
+        engine = get_engine()
+        version, cache_key = answer_key(engine, question)
+        cached_answer = cache.get(cache_key)
+        if cached_answer:
+            logging.info(f"캐시된 응답 반환: {cached_answer}")
+            return JsonResponse({"answer": cached_answer}, status=200)
+
+        # 의미 기반 캐시 확인 (질문 임베딩은 한 번만 계산해 검색에도 재사용)
+        embed_started = time.perf_counter()
+        vector = engine.embed(question)
+        embed_ms = (time.perf_counter() - embed_started) * 1000
+        cached_answer = semantic_answer(engine, vector, version)
+        if cached_answer:
+            return JsonResponse({"answer": cached_answer}, status=200)
+
+        # 답변 생성 (엔진은 워커당 한 번만 생성되어 재사용)
+        answer, timings = engine.answer(question, vector)
+        timings["embedding"] = embed_ms
+        if answer is None:
+            return JsonResponse({"error": "관련 정보를 찾을 수 없습니다."}, status=404)
+
+        # 캐시에 응답 저장 후 대화 저장
+        remember_answer(engine, cache_key, vector, question, answer, version)
+        save_chat_log(user, question, answer)
+        return timed_answer_response(answer, timings, started)
+
+    except Exception as e:
+        logging.error(f"Error in Q&A: {str(e)}")
+        return JsonResponse({"error": "서버 내부 오류가 발생했습니다."}, status=500)
 
-            if not question or not session_id:
-                return JsonResponse({"error": "질문과 세션 ID를 입력해주세요."}, status=400)
 
-            # 세션 검증 및 사용자 가져오기
-            try:
-                session = Session.objects.get(session_key=session_id)
-                user_id = session.get_decoded().get('user_id')
-                user = User.objects.get(id=user_id)
-            except Session.DoesNotExist:
-                return JsonResponse({"error": "유효하지 않은 세션 ID입니다."}, status=401)
-            except User.DoesNotExist:
-                return JsonResponse({"error": "사용자를 찾을 수 없습니다."}, status=404)
-
-            # 캐시에서 확인
-            cached_answer = cache.get(question)
-            if cached_answer:
-                logging.info(f"캐시된 응답 반환: {cached_answer}")
-                return JsonResponse({"answer": cached_answer}, status=200)
-
-            # ChromaDB
-            db = Chroma(
-                collection_name=CHROMADB_COLLECTION,
-                persist_directory=CHROMADB_DIR,
-                embedding_function=OpenAIEmbeddings(model="text-embedding-3-small")
-            )
-            retriever = db.as_retriever(search_kwargs={"k": 5})
-
-            # Chaining
-            prompt = PromptTemplate(
-                input_variables=["context", "question"],
-                template="Context: {context}\n\nQuestion: {question}\n\nAnswer: ",
-            )
-            chain = load_qa_chain(
-                llm=ChatOpenAI(model_name="gpt-4o-mini", temperature=0),
-                chain_type="stuff",
-                prompt=prompt
-            )
-
-            # 답변 생성
-            documents = retriever.get_relevant_documents(question)
-            if not documents:
-                return JsonResponse({"error": "관련 정보를 찾을 수 없습니다."}, status=404)
+@csrf_exempt
+async def qna_async(request):
+    """
+    qna 의 비동기 버전. 임베딩/검색/LLM 호출과 ORM 접근이 모두 비동기라
+    OpenAI 응답을 기다리는 동안 워커 스레드를 점유하지 않는다 (ASGI).
+    """
+    if request.method != 'POST':
+        return JsonResponse({"error": "잘못된 요청입니다."}, status=400)
+
+    try:
+        started = time.perf_counter()
+        question, session_id, error = parse_question(request)
+        if error:
+            return error
 
-            answer = chain.run(input_documents=documents, question=question)
+        try:
+            user = await aget_session_user(session_id)
+        except (InvalidSession, User.DoesNotExist) as e:
+            return session_error(e)
 
-            # 캐시에 응답 저장
-            cache.set(question, answer, timeout=300)
+        engine = get_engine()
+        version, cache_key = answer_key(engine, question)
+        cached_answer = await cache.aget(cache_key)
+        if cached_answer:
+            logging.info(f"캐시된 응답 반환: {cached_answer}")
+            return JsonResponse({"answer": cached_answer}, status=200)
 
-            # 대화 저장
-            ChatLog.objects.create(
-                user=user,
-                user_input=question,
-                chatbot_reply=answer
-            )
+        embed_started = time.perf_counter()
+        vector = await engine.aembed(question)
+        embed_ms = (time.perf_counter() - embed_started) * 1000
+        cached_answer = semantic_answer(engine, vector, version)
+        if cached_answer:
+            return JsonResponse({"answer": cached_answer}, status=200)
 
-            return JsonResponse({"answer": answer}, status=200)
+        answer, timings = await engine.aanswer(question, vector)
+        timings["embedding"] = embed_ms
+        if answer is None:
+            return JsonResponse({"error": "관련 정보를 찾을 수 없습니다."}, status=404)
 
-        except Exception as e:
-            logging.error(f"Error in Q&A: {str(e)}")
-            return JsonResponse({"error": "서버 내부 오류가 발생했습니다."}, status=500)
+        await aremember_answer(engine, cache_key, vector, question, answer, version)
+        await asave_chat_log(user, question, answer)
+        return timed_answer_response(answer, timings, started)
+
+    except Exception as e:
+        logging.error(f"Error in Q&A: {str(e)}")
+        return JsonResponse({"error": "서버 내부 오류가 발생했습니다."}, status=500)
 
-    return JsonResponse({"error": "잘못된 요청입니다."}, status=400)
 
+def sse_event(event, data):
+    """Server-Sent Events 형식의 메시지 (토큰 안의 줄바꿈이 깨지지 않도록 JSON으로 감싼다)"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
 
 
+def sse_response(events):
+    response = StreamingHttpResponse(events, content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # 프록시 버퍼링 방지
+    return response
+
+
+@csrf_exempt
+async def qna_stream(request):
+    """
+    검색이 끝나는 즉시 답변 토큰을 SSE로 전송하는 Q&A 엔드포인트 (ASGI 전용).
+    캐시된 답변도 같은 스트림 형식으로 내보낸다.
+    """
+    if request.method != 'POST':
+        return JsonResponse({"error": "잘못된 요청입니다."}, status=400)
+
+    question, session_id, error = parse_question(request)
+    if error:
+        return error
+
+    try:
+        user = await aget_session_user(session_id)
+    except (InvalidSession, User.DoesNotExist) as e:
+        return session_error(e)
+
+    async def events():
+        try:
+            engine = get_engine()
+            version, cache_key = answer_key(engine, question)
+            cached_answer = await cache.aget(cache_key)
+            if not cached_answer:
+                vector = await engine.aembed(question)
+                cached_answer = semantic_answer(engine, vector, version)
+            if cached_answer:
+                yield sse_event("token", {"token": cached_answer})
+                yield sse_event("done", {"answer": cached_answer, "cached": True})
+                return
+
+            documents = await engine.aretrieve(question, vector)
+            if not documents:
+                yield sse_event("error", {"error": "관련 정보를 찾을 수 없습니다."})
+                return
+
+            tokens = []
+            async for token in engine.astream(documents, question):
+                tokens.append(token)
+                yield sse_event("token", {"token": token})
+            answer = "".join(tokens)
+
+            # 스트림이 끝난 뒤 캐시와 대화 기록 저장
+            await aremember_answer(engine, cache_key, vector, question, answer, version)
+            await asave_chat_log(user, question, answer)
+            yield sse_event("done", {"answer": answer, "cached": False})
+
+        except Exception as e:
+            logging.error(f"Error in Q&A stream: {str(e)}")
+            yield sse_event("error", {"error": "서버 내부 오류가 발생했습니다."})
+
+    return sse_response(events())
+
+
+def cache_stats(request):
+    engine = get_engine()
+    return JsonResponse({
+        "semantic_cache": engine.semantic_cache.stats(),
+        "embedding_cache": engine.embeddings.stats(),
+        "chatlog_writer": chatlog_writer.stats(),
+    }, status=200)
 
 
 @csrf_exempt
@@ -110,16 +255,13 @@ def save_chat(request):
                 return JsonResponse({"error": "필수 데이터가 누락되었습니다."}, status=400)
 
             # 세션 검증 및 사용자 가져오기
-            session = Session.objects.get(session_key=session_id)
-            user_id = session.get_decoded().get('user_id')
-            user = User.objects.get(id=user_id)
+            try:
+                user = get_session_user(session_id)
+            except (InvalidSession, User.DoesNotExist) as e:
+                return session_error(e)
 
             # 대화 저장
-            ChatLog.objects.create(
-                user=user,
-                user_input=user_input,
-                chatbot_reply=chatbot_reply
-            )
+            save_chat_log(user, user_input, chatbot_reply)
 
             return JsonResponse({"message": "채팅 기록이 저장되었습니다."}, status=201)
 
@@ -129,30 +271,83 @@ def save_chat(request):
     return JsonResponse({"error": "잘못된 요청입니다."}, status=400)
 
 
+HISTORY_DEFAULT_LIMIT = 50
+HISTORY_MAX_LIMIT = 200
+
+
+def encode_cursor(timestamp, log_id):
+    return base64.urlsafe_b64encode(f"{timestamp.isoformat()}|{log_id}".encode()).decode()
+
+
+def decode_cursor(cursor):
+    timestamp, log_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+    return datetime.fromisoformat(timestamp), int(log_id)
+
+
+def history_messages(user_input, chatbot_reply):
+    return [
+        {"sender": "user", "message": user_input},
+        {"sender": "bot", "message": chatbot_reply},
+    ]
+
+
+def stream_history(chat_logs):
+    """전체 대화 기록을 한 번에 메모리에 올리지 않고 JSON 으로 내보낸다."""
+    yield '{"history": ['
+    first = True
+    for user_input, chatbot_reply in chat_logs.values_list('user_input', 'chatbot_reply').iterator(chunk_size=2000):
+        for message in history_messages(user_input, chatbot_reply):
+            yield ("" if first else ",") + json.dumps(message, ensure_ascii=False)
+            first = False
+    yield ']}'
+
+
 @csrf_exempt
 def get_chat_history(request):
+    """
+    limit 을 주면 (timestamp, id) 커서 기반으로 한 페이지씩 반환하고 next_cursor 를 함께 준다.
+    limit 이 없으면 전체 기록을 스트리밍 JSON 으로 내보낸다.
+    """
     if request.method == 'POST':
         try:
             data = json.loads(request.body)
             session_id = data.get("session_id")
 
             # 세션 검증 및 사용자 가져오기
-            session = Session.objects.get(session_key=session_id)
-            user_id = session.get_decoded().get('user_id')
-            user = User.objects.get(id=user_id)
+            user = get_session_user(session_id)
 
             # 대화 확인
-            chat_logs = ChatLog.objects.filter(user=user).order_by('timestamp')
+            chat_logs = ChatLog.objects.filter(user=user).order_by('timestamp', 'id')
+
+            if data.get("limit") is None:
+                return StreamingHttpResponse(stream_history(chat_logs), content_type="application/json")
+
+            try:
+                limit = min(int(data["limit"]), HISTORY_MAX_LIMIT)
+                cursor = decode_cursor(data["cursor"]) if data.get("cursor") else None
+            except (TypeError, ValueError):
+                return JsonResponse({"error": "잘못된 limit 또는 cursor 입니다."}, status=400)
+            if limit < 1:
+                return JsonResponse({"error": "잘못된 limit 또는 cursor 입니다."}, status=400)
+
+            if cursor:
+                timestamp, log_id = cursor
+                chat_logs = chat_logs.filter(Q(timestamp__gt=timestamp) | Q(timestamp=timestamp, id__gt=log_id))
+
+            # 한 개 더 가져와 다음 페이지가 있는지 확인
+            rows = list(chat_logs.values_list('id', 'timestamp', 'user_input', 'chatbot_reply')[:limit + 1])
+            has_more = len(rows) > limit
+            rows = rows[:limit]
 
             # 질문-응답 형태로 데이터 정렬
             history = []
-            for log in chat_logs:
-                history.append({"sender": "user", "message": log.user_input})
-                history.append({"sender": "bot", "message": log.chatbot_reply})
+            for _, _, user_input, chatbot_reply in rows:
+                history.extend(history_messages(user_input, chatbot_reply))
 
-            return JsonResponse({"history": history}, status=200)
+            next_cursor = encode_cursor(rows[-1][1], rows[-1][0]) if has_more else None
+            return JsonResponse({"history": history, "next_cursor": next_cursor}, status=200)
 
-        except Session.DoesNotExist:
+        except InvalidSession:
             return JsonResponse({"error": "세션이 유효하지 않습니다."}, status=401)
         except User.DoesNotExist:
             return JsonResponse({"error": "사용자를 찾을 수 없습니다."}, status=404)
@@ -160,4 +355,3 @@ def get_chat_history(request):
             return JsonResponse({"error": str(e)}, status=500)
 
     return JsonResponse({"error": "잘못된 요청입니다."}, status=400)
-
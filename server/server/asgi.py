@@ -3,6 +3,9 @@ ASGI config for server project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+The streaming Q&A endpoint (/qna/stream/) needs an ASGI server, e.g.
+``uvicorn server.asgi:application``.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
 """
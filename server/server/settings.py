@@ -40,10 +40,20 @@ CORS_ALLOWED_ORIGINS = [
 ]
 CORS_ALLOW_ALL_ORIGINS = DEBUG  
 
+# 캐시 설정 (여러 워커 간 캐시 무효화를 공유하려면 redis/memcached 등으로 설정)
+# locmem 이면 로그아웃을 다른 워커에 알릴 수 없으므로 세션 -> 사용자 캐시는 사용하지 않는다 (accounts/auth.py)
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv("DJANGO_CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        'LOCATION': os.getenv("DJANGO_CACHE_LOCATION", ""),
+    }
+}
+
 # 세션 설정
-SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+# 'django.contrib.sessions.backends.cached_db' 로 설정하면 세션을 캐시에서 먼저 읽는다 (공유 캐시 권장)
+SESSION_ENGINE = os.getenv("SESSION_ENGINE", 'django.contrib.sessions.backends.db')
 SESSION_COOKIE_AGE = int(os.getenv("SESSION_COOKIE_AGE", 1209600))  # 기본값: 2주
-SESSION_SAVE_EVERY_REQUEST = True
+SESSION_SAVE_EVERY_REQUEST = os.getenv("SESSION_SAVE_EVERY_REQUEST", "True").lower() == "true"
 SESSION_EXPIRE_AT_BROWSER_CLOSE = False
 
 # 설치된 앱
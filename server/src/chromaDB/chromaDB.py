@@ -1,19 +1,22 @@
 from langchain_chroma import Chroma
 from langchain.chat_models import ChatOpenAI
-from langchain_openai.embeddings import OpenAIEmbeddings
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.runnables import RunnablePassthrough
 from langchain import hub
 import os
+import sys
 from dotenv import load_dotenv
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from embedding_cache import get_embeddings
+
 load_dotenv()
 
 class ChromaDBHandler:
     def __init__(self):
         self.db = Chroma(
             persist_directory=os.getenv("CHROMADB_DIR"),
-            embedding_function=OpenAIEmbeddings(model="text-embedding-3-small"),
+            embedding_function=get_embeddings("text-embedding-3-small"),
             collection_name=os.getenv("CHROMADB_COLLECTION")
         )
         self.retriever = self.db.as_retriever()
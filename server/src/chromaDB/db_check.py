@@ -1,17 +1,20 @@
 import os
+import sys
 from dotenv import load_dotenv
 from langchain_chroma import Chroma
-from langchain_openai.embeddings import OpenAIEmbeddings
 
 # 환경 변수 로드
 load_dotenv()
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from embedding_cache import get_embeddings
+
 # ChromaDB 관련 설정
 CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
 DB_DIR = os.path.join(CURRENT_DIR, "../../chroma_db")  # ChromaDB가 저장된 디렉토리
 
 # ChromaDB 초기화
-openAI = OpenAIEmbeddings(model="text-embedding-3-small")
+openAI = get_embeddings("text-embedding-3-small")
 db = Chroma(persist_directory=DB_DIR, embedding_function=openAI)
 
 def list_collections():
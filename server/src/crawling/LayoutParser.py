@@ -1,7 +1,7 @@
 import os
 import pandas as pd
 from dotenv import load_dotenv
-from langchain_upstage import UpstageLayoutAnalysisLoader
+from ocr import OCRStage
 
 # 환경변수 로드
 load_dotenv()
@@ -14,35 +14,29 @@ def parse_images():
     # 결과를 저장할 리스트
     image_data = []
 
-    # 이미지 파일들을 순차적으로 처리
+    # 이미지 파일들을 OCR 작업 큐에 넣고 (병렬 처리, 같은 이미지는 캐시 사용)
+    ocr_stage = OCRStage()
+    jobs = []
     for img_file in os.listdir(image_dir):
         img_path = os.path.join(image_dir, img_file)
         
         if img_file.endswith(('.jpg', '.jpeg', '.png')):  # 이미지 파일인지 확인
             print(f"Processing {img_file}...")
-
-            # 문서 로더 설정
-            loader = UpstageLayoutAnalysisLoader(
-                img_path,
-                output_type="text",
-                split="page",
-                use_ocr=True,
-                exclude=["header", "footer"],
-            )
-
-            # 문서 로드
-            docs = loader.load()
-
-            # 임시 제목 처리 (필요에 따라 수정)
-            title = os.path.splitext(img_file)[0]
-
-            # 각 이미지에서 추출된 텍스트를 리스트에 추가
-            for doc in docs:
-                image_data.append({
-                    "image": img_file, 
-                    "text": doc, 
-                    "title": title
-                })
+            jobs.append((img_file, ocr_stage.submit(img_path)))
+
+    # 파일 순서대로 결과 수집
+    for img_file, future in jobs:
+        # 임시 제목 처리 (필요에 따라 수정)
+        title = os.path.splitext(img_file)[0]
+
+        # 각 이미지에서 추출된 텍스트를 리스트에 추가
+        for doc in future.result():
+            image_data.append({
+                "image": img_file, 
+                "text": doc, 
+                "title": title
+            })
+    ocr_stage.shutdown()
 
     # 데이터를 DataFrame으로 변환
     df = pd.DataFrame(image_data)
@@ -0,0 +1,95 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+CRAWL_STATE_PATH = os.getenv("CRAWL_STATE_PATH", os.path.join(CURRENT_DIR, "../../data/cache/crawl_state.sqlite3"))
+
+
+class CrawlState:
+    """
+    크롤링 실행 간에 유지되는 상태 저장소.
+    - pages: URL별 ETag/Last-Modified, 내용 해시, 마지막으로 파싱한 결과
+    - posts: 게시판(menu_idx)별로 이미 본 게시물(data_idx)
+    """
+
+    def __init__(self, path=CRAWL_STATE_PATH):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.executescript("""
+            PRAGMA journal_mode=WAL;
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                content_hash TEXT,
+                result TEXT,
+                fetched_at REAL
+            );
+            CREATE TABLE IF NOT EXISTS posts (
+                menu_idx TEXT,
+                data_idx TEXT,
+                url TEXT,
+                first_seen REAL,
+                PRIMARY KEY (menu_idx, data_idx)
+            );
+        """)
+        self._conn.commit()
+
+    def get_page(self, url):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, content_hash, result FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        etag, last_modified, content_hash, result = row
+        return {
+            "etag": etag,
+            "last_modified": last_modified,
+            "content_hash": content_hash,
+            "result": json.loads(result) if result else None,
+        }
+
+    def save_page(self, url, etag, last_modified, content_hash, result):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages (url, etag, last_modified, content_hash, result, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, content_hash, json.dumps(result, ensure_ascii=False), time.time())
+            )
+            self._conn.commit()
+
+    def is_seen(self, menu_idx, data_idx):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM posts WHERE menu_idx = ? AND data_idx = ?", (menu_idx, data_idx)
+            ).fetchone()
+        return row is not None
+
+    def mark_seen(self, menu_idx, data_idx, url):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO posts (menu_idx, data_idx, url, first_seen) VALUES (?, ?, ?, ?)",
+                (menu_idx, data_idx, url, time.time())
+            )
+            self._conn.commit()
+
+    def known_posts(self, menu_idx):
+        """게시판에서 지금까지 수집한 게시물의 마지막 파싱 결과 (최근에 발견한 순)"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT p.url, pg.result FROM posts p JOIN pages pg ON pg.url = p.url "
+                "WHERE p.menu_idx = ? ORDER BY p.first_seen DESC", (menu_idx,)
+            ).fetchall()
+        return [(url, json.loads(result)) for url, result in rows if result]
+
+    def forget_post(self, menu_idx, url):
+        """원본에서 삭제된 게시물을 상태에서 지운다"""
+        with self._lock:
+            self._conn.execute("DELETE FROM posts WHERE menu_idx = ? AND url = ?", (menu_idx, url))
+            self._conn.execute("DELETE FROM pages WHERE url = ?", (url,))
+            self._conn.commit()
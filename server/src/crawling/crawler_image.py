@@ -1,12 +1,18 @@
 import os
+import time
+import threading
 import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
 from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 import uuid
 import re
 import hashlib
 import pandas as pd
-from langchain_upstage import UpstageLayoutAnalysisLoader
+from crawl_state import CrawlState
+from ocr import OCRStage
 
 # 환경 변수 로드
 load_dotenv()
@@ -27,9 +33,117 @@ CATEGORY_PATHS = {
     "2711": "../../data/csv/mjc_promotion.csv",
 }
 
+# 동시성 설정
+MAX_WORKERS = int(os.getenv("CRAWL_MAX_WORKERS", 8))            # 게시물/이미지 병렬 처리 수
+MAX_PER_HOST = int(os.getenv("CRAWL_MAX_PER_HOST", 4))          # 호스트당 동시 요청 수
+MIN_INTERVAL = float(os.getenv("CRAWL_MIN_INTERVAL", 0.1))      # 호스트당 요청 간 최소 간격(초)
+MAX_PAGES = int(os.getenv("CRAWL_MAX_PAGES", 5))                # 게시판 목록을 넘겨볼 최대 페이지 수
+
 for image_dir in CATEGORY_IMAGE_DIRS.values():
     os.makedirs(image_dir, exist_ok=True)
 
+
+class HostLimiter:
+    """호스트별 동시 요청 수와 요청 간격을 제한"""
+
+    def __init__(self, max_per_host=MAX_PER_HOST, min_interval=MIN_INTERVAL):
+        self.max_per_host = max_per_host
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._semaphores = {}
+        self._next_slot = {}
+
+    def _semaphore(self, host):
+        with self._lock:
+            if host not in self._semaphores:
+                self._semaphores[host] = threading.BoundedSemaphore(self.max_per_host)
+            return self._semaphores[host]
+
+    def _wait_turn(self, host):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.min_interval
+        time.sleep(max(0.0, slot - now))
+
+    def request(self, method, url, **kwargs):
+        host = urlparse(url).netloc
+        with self._semaphore(host):
+            self._wait_turn(host)
+            return method(url, **kwargs)
+
+
+# keep-alive 연결을 재사용하는 공유 세션
+session = requests.Session()
+session.mount("http://", HTTPAdapter(pool_connections=10, pool_maxsize=MAX_WORKERS * 2))
+session.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=MAX_WORKERS * 2))
+limiter = HostLimiter()
+
+# 게시물 처리와 이미지 처리는 서로 다른 풀을 사용 (게시물 작업이 이미지 작업을 기다리며 교착되지 않도록)
+post_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS)
+image_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS)
+
+
+def fetch(url, **kwargs):
+    """공유 세션과 호스트별 제한을 거쳐 GET 요청"""
+    kwargs.setdefault("timeout", 10)
+    return limiter.request(session.get, url, **kwargs)
+
+
+# 실행 간에 유지되는 크롤링 상태 (ETag/Last-Modified, 내용 해시, 이미 본 게시물, OCR 결과)
+state = CrawlState()
+
+# 크롤링과 겹쳐서 실행되는 OCR 단계 (이미지 바이트 해시로 디스크 캐시)
+ocr_stage = OCRStage()
+
+
+def conditional_fetch(url):
+    """
+    이전에 받은 ETag/Last-Modified 로 조건부 요청을 보낸다.
+    (response, cached) 를 반환하며, 304 응답이면 response 는 None.
+    """
+    cached = state.get_page(url)
+    headers = {}
+    if cached and cached["etag"]:
+        headers["If-None-Match"] = cached["etag"]
+    if cached and cached["last_modified"]:
+        headers["If-Modified-Since"] = cached["last_modified"]
+    response = fetch(url, headers=headers)
+    if response.status_code == 304 and cached and cached["result"] is not None:
+        return None, cached
+    return response, cached
+
+
+def save_page(url, response, content_hash, result):
+    state.save_page(
+        url,
+        response.headers.get("ETag"),
+        response.headers.get("Last-Modified"),
+        content_hash,
+        result,
+    )
+
+
+class DownloadedImages:
+    """여러 스레드가 공유하는 이미지 중복 확인 집합"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hashes = set()
+
+    def claim(self, img_hash):
+        # 처음 보는 이미지면 True. 다른 스레드가 같은 이미지를 동시에 받지 않도록 먼저 등록한다.
+        with self._lock:
+            if img_hash in self._hashes:
+                return False
+            self._hashes.add(img_hash)
+            return True
+
+    def release(self, img_hash):
+        # 다운로드에 실패한 이미지는 다음 게시물에서 다시 시도할 수 있도록 해제
+        with self._lock:
+            self._hashes.discard(img_hash)
+
 def sanitize_filename(filename):
     return re.sub(r'[<>:"/\\|?*]', '_', filename)
 
@@ -48,102 +162,190 @@ def extract_links(soup, menu_idx):
                 parts = href.split("'")
                 if len(parts) >= 3:
                     bm_id, bd_id = parts[1], parts[3]
-                    links.append({"url": f"{BASE_URL}/bbs/data/view.do?pageIndex=1&SC_KEY=&SC_KEYWORD=&bbs_mst_idx={bm_id}&menu_idx={menu_idx}&tabCnt=&per_menu_idx=&submenu_idx=&data_idx={bd_id}&memberAuth=Y"})
+                    links.append({"id": bd_id, "url": f"{BASE_URL}/bbs/data/view.do?pageIndex=1&SC_KEY=&SC_KEYWORD=&bbs_mst_idx={bm_id}&menu_idx={menu_idx}&tabCnt=&per_menu_idx=&submenu_idx=&data_idx={bd_id}&memberAuth=Y"})
             elif href:
-                links.append({"url": href})
+                links.append({"id": href, "url": href})
     return links
 
+def download_image(img_url, downloaded_images, image_dir):
+    """
+    이미지를 내려받아 OCR 작업 큐에 넣는다. OCR 결과 Future 를 반환하며,
+    이번 실행에서 이미 처리한 이미지이거나 다운로드에 실패하면 None.
+    같은 URL 의 이미지가 교체될 수 있으므로 OCR 결과는 URL 이 아니라 OCRStage 의 이미지 바이트 해시 캐시로 재사용한다.
+    """
+    # 이미지 URL의 해시 계산
+    img_hash = hashlib.md5(img_url.encode('utf-8')).hexdigest()
+
+    # 중복 확인: 이미 다운로드된 이미지라면 건너뜀
+    if not downloaded_images.claim(img_hash):
+        return None
+
+    try:
+        img_response = fetch(img_url, stream=True)
+        if img_response.status_code != 200:
+            downloaded_images.release(img_hash)
+            return None
+
+        content_type = img_response.headers.get('Content-Type', '')
+        extension = get_extension_from_content_type(content_type)
+        unique_name = f"{img_hash}_{sanitize_filename(os.path.basename(img_url).split('?')[0])}{extension}"
+        img_path = os.path.join(image_dir, unique_name)
+
+        os.makedirs(os.path.dirname(img_path), exist_ok=True)  # Ensure directory exists
+
+        with open(img_path, 'wb') as img_file:
+            for chunk in img_response.iter_content(1024):
+                img_file.write(chunk)
+    except Exception:
+        downloaded_images.release(img_hash)
+        raise
+
+    # OCR 은 별도 단계에서 처리 (기다리지 않고 다음 작업으로 넘어감)
+    return ocr_stage.submit(img_path)
+
 def extract_content(link, downloaded_images, image_dir):
     """
     Extracts title, content, date, and images from the given link.
     """
     try:
-        response = requests.get(link, timeout=10)
+        response, cached = conditional_fetch(link)
+        if response is None:
+            return cached["result"]  # 304: 변경 없음
         response.encoding = 'utf-8'
 
         if response.status_code != 200:
             return {"error": f"Failed to retrieve content (status code: {response.status_code})"}
 
+        return parse_post(link, response, cached, downloaded_images, image_dir)
+    except Exception as e:
+        return {"error": f"오류 발생: {e}"}
+
+def parse_post(link, response, cached, downloaded_images, image_dir):
+    """게시물 페이지 응답에서 제목/본문/날짜를 추출하고 본문 이미지를 OCR 큐에 넣는다."""
+    try:
         soup = BeautifulSoup(response.text, 'html.parser')
 
         # 제목 추출
         title = soup.find("h2", class_="tit").get_text(strip=True) if soup.find("h2", class_="tit") else "제목 없음"
 
-        # 내용 추출
-        content_text = soup.find("div", class_="memo", id="divMemo").get_text(strip=True) if soup.find("div", class_="memo", id="divMemo") else "Content not found"
+        # 날짜/첨부파일 추출 (정보 표의 조회수 등은 자주 바뀌므로 이 값들만 사용)
+        table = soup.find("table", class_="tbl_data")
+        date = next((td.get_text(strip=True) for td in table.find_all("td") if re.match(r"\d{4}-\d{2}-\d{2}", td.get_text(strip=True))), "날짜 없음") if table else "날짜 없음"
+        attachments = [a["href"] for a in table.find_all("a", href=True)] if table else []
+
+        # 제목/본문/날짜/첨부가 이전과 같으면 이미지 다운로드/OCR 없이 이전 결과를 재사용
+        memo = soup.find("div", class_="memo", id="divMemo")
+        content_hash = hashlib.sha256("\x00".join(
+            [title, str(memo), date] + attachments
+        ).encode("utf-8")).hexdigest()
+        if cached and cached["content_hash"] == content_hash and cached["result"] is not None:
+            save_page(link, response, content_hash, cached["result"])
+            return cached["result"]
 
-        # 날짜 추출
-        date = next((td.get_text(strip=True) for td in soup.find("table", class_="tbl_data").find_all("td") if re.match(r"\d{4}-\d{2}-\d{2}", td.get_text(strip=True))), "날짜 없음")
+        # 내용 추출
+        content_text = memo.get_text(strip=True) if memo else "Content not found"
 
         # 이미지 다운로드 및 OCR
-        images = soup.find("div", class_="memo", id="divMemo").find_all("img") if soup.find("div", class_="memo", id="divMemo") else []
+        images = memo.find_all("img") if memo else []
         context_data = content_text  # 초기 context는 content_text로 설정
 
+        img_urls = []
         for img in images:
             img_url = img.get("src")
             if not img_url:
                 continue
             if not img_url.startswith("http"):
                 img_url = f"{BASE_URL}{img_url}"
+            img_urls.append(img_url)
 
-            # 이미지 URL의 해시 계산
-            img_hash = hashlib.md5(img_url.encode('utf-8')).hexdigest()
-
-            # 중복 확인: 이미 다운로드된 이미지라면 건너뜀
-            if img_hash in downloaded_images:
-                continue
-
-            img_response = requests.get(img_url, stream=True, timeout=10)
-            if img_response.status_code != 200:
-                continue
-
-            content_type = img_response.headers.get('Content-Type', '')
-            extension = get_extension_from_content_type(content_type)
-            unique_name = f"{img_hash}_{sanitize_filename(os.path.basename(img_url).split('?')[0])}{extension}"
-            img_path = os.path.join(image_dir, unique_name)
-
-            os.makedirs(os.path.dirname(img_path), exist_ok=True)  # Ensure directory exists
-
-            with open(img_path, 'wb') as img_file:
-                for chunk in img_response.iter_content(1024):
-                    img_file.write(chunk)
-
-            # 다운로드된 이미지 해시 추가
-            downloaded_images.add(img_hash)
-
-            # OCR 및 텍스트 파싱
-            loader = UpstageLayoutAnalysisLoader(
-                img_path,
-                output_type="text",
-                split="page",
-                use_ocr=True,
-                exclude=["header", "footer"],
-            )
-            docs = loader.load()
-            for doc in docs:
-                context_data += f"\n{str(doc)}"  # context에 OCR 결과 추가
-                break  # 첫 번째 문서만 처리
+        # 이미지는 병렬로 내려받고, OCR 결과는 finish_content 에서 본문 내 이미지 순서대로 붙인다
+        ocr_jobs = [job for job in image_executor.map(lambda url: download_image(url, downloaded_images, image_dir), img_urls) if job]
 
         return {
             "title": title,
             "context": context_data,
             "date": date,
-            "link": link
+            "link": link,
+            "_ocr_jobs": ocr_jobs,
+            "_page": (response, content_hash),
         }
     except Exception as e:
         return {"error": f"오류 발생: {e}"}
 
+def finish_content(result):
+    """OCR 작업이 끝나길 기다려 context 에 붙이고 크롤링 상태에 저장한다."""
+    if "_ocr_jobs" not in result:
+        return result  # 변경 없는 게시물 (이전 결과)
+    try:
+        context_data = result["context"]
+        for future in result.pop("_ocr_jobs"):
+            pages = future.result()
+            ocr_text = pages[0] if pages else ""  # 첫 번째 문서만 처리
+            if ocr_text:
+                context_data += f"\n{ocr_text}"  # context에 OCR 결과 추가
+        result["context"] = context_data
+        response, content_hash = result.pop("_page")
+        save_page(result["link"], response, content_hash, result)
+        return result
+    except Exception as e:
+        return {"error": f"오류 발생: {e}"}
+
+def recheck_post(url, previous, downloaded_images, image_dir):
+    """
+    이번 목록에 없던 이전 게시물을 조건부 요청으로 다시 확인한다.
+    삭제된 게시물(404 또는 본문 없음)이면 None, 일시적인 오류면 이전 결과를 그대로 반환한다.
+    """
+    try:
+        response, cached = conditional_fetch(url)
+    except Exception as e:
+        print(f"게시물 재확인 실패, 이전 결과 유지: {e} (링크: {url})")
+        return previous
+    if response is None:
+        return previous  # 304: 변경 없음
+    if response.status_code == 404:
+        return None
+    if response.status_code != 200:
+        return previous
+    response.encoding = 'utf-8'
+
+    result = parse_post(url, response, cached, downloaded_images, image_dir)
+    if result.get("context") == "Content not found":
+        return None
+    if "error" not in result:
+        result = finish_content(result)
+    return previous if "error" in result else result
+
+def recheck_known_posts(menu_idx, crawled):
+    """이전 실행에서 수집한 게시물 중 이번에 크롤링하지 않은 것을 다시 확인하고, 삭제된 게시물은 상태에서 지운다."""
+    downloaded_images = DownloadedImages()
+    image_dir = CATEGORY_IMAGE_DIRS[menu_idx]
+    known = [(url, result) for url, result in state.known_posts(menu_idx) if url not in crawled]
+    results = post_executor.map(lambda item: recheck_post(item[0], item[1], downloaded_images, image_dir), known)
+
+    kept = []
+    for (url, _), result in zip(known, results):
+        if result is None:
+            print(f"삭제된 게시물 제외: {url}")
+            state.forget_post(menu_idx, url)
+            continue
+        kept.append({key: result[key] for key in ("title", "context", "date", "link")})
+    return kept
+
 def download_images_and_extract_content(links, menu_idx):
     combined_data = []
-    downloaded_images = set()
+    downloaded_images = DownloadedImages()
     image_dir = CATEGORY_IMAGE_DIRS[menu_idx]
 
-    for link_info in links:
-        link = link_info["url"]
-        result = extract_content(link, downloaded_images, image_dir)
+    # 게시물을 병렬로 처리하되 결과는 목록 순서대로 모은다
+    urls = [link_info["url"] for link_info in links]
+    results = post_executor.map(lambda link: extract_content(link, downloaded_images, image_dir), urls)
+    for link_info, result in zip(links, results):
+        if "error" not in result:
+            result = finish_content(result)
         if "error" in result:
-            print(f"오류: {result['error']} (링크: {link})")
+            print(f"오류: {result['error']} (링크: {link_info['url']})")
             continue
+        state.mark_seen(menu_idx, link_info["id"], link_info["url"])
 
         combined_data.append({
             "title": result["title"],
@@ -153,28 +355,61 @@ def download_images_and_extract_content(links, menu_idx):
         })
     return combined_data
 
+def list_url(menu_idx, page_index):
+    return f'{BASE_URL}/bbs/data/list.do?pageIndex={page_index}&SC_KEY=&SC_KEYWORD=&bbs_mst_idx=BM0000002205&menu_idx={menu_idx}&tabCnt=&per_menu_idx=&submenu_idx=&data_idx=&memberAuth=Y'
+
+def fetch_list_page(url, menu_idx):
+    """게시판 목록 페이지의 링크 목록. 304 이면 이전에 저장한 목록을 사용한다."""
+    response, cached = conditional_fetch(url)
+    if response is None:
+        return cached["result"]
+    response.encoding = 'utf-8'
+    if response.status_code != 200:
+        raise ValueError(f"페이지 요청 실패: {response.status_code}")
+
+    links = extract_links(BeautifulSoup(response.text, 'html.parser'), menu_idx)
+    save_page(url, response, None, links)
+    return links
+
+def collect_links(menu_idx):
+    """
+    목록을 1페이지부터 넘기다가 이미 본 게시물이 나오면 멈춘다.
+    (반환: 링크 목록, 요청한 목록 페이지 수)
+    """
+    links = []
+    page_index = 0
+    for page_index in range(1, MAX_PAGES + 1):
+        page_links = fetch_list_page(list_url(menu_idx, page_index), menu_idx)
+        if not page_links:
+            break
+        links.extend(page_links)
+        if any(state.is_seen(menu_idx, link["id"]) for link in page_links):
+            break
+    return links, page_index
+
 def main():
     for menu_idx, csv_path in CATEGORY_PATHS.items():
         try:
-            url = f'{BASE_URL}/bbs/data/list.do?pageIndex=1&SC_KEY=&SC_KEYWORD=&bbs_mst_idx=BM0000002205&menu_idx={menu_idx}&tabCnt=&per_menu_idx=&submenu_idx=&data_idx=&memberAuth=Y'
-            response = requests.get(url)
-            response.encoding = 'utf-8'
-
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'html.parser')
-                links = extract_links(soup, menu_idx)
-                print(f"\n총 추출된 링크 수 (menu_idx={menu_idx}): {len(links)}")
-
-                combined_data = download_images_and_extract_content(links, menu_idx)
-                print(f"\n총 처리된 게시물 수 (menu_idx={menu_idx}): {len(combined_data)}")
-
-                # DataFrame으로 변환 후 CSV로 저장
-                df = pd.DataFrame(combined_data)
-                os.makedirs(os.path.dirname(csv_path), exist_ok=True)
-                df.to_csv(csv_path, index=False, encoding="utf-8-sig")
-                print(f"결과가 '{csv_path}'에 저장되었습니다.")
-            else:
-                print(f"페이지 요청 실패 (menu_idx={menu_idx}): {response.status_code}")
+            started = time.perf_counter()
+            links, list_pages = collect_links(menu_idx)
+            print(f"\n총 추출된 링크 수 (menu_idx={menu_idx}): {len(links)}")
+
+            combined_data = download_images_and_extract_content(links, menu_idx)
+            print(f"\n총 처리된 게시물 수 (menu_idx={menu_idx}): {len(combined_data)}")
+
+            # 이번에 목록에 없던, 이전 실행에서 수집한 게시물도 다시 확인해 남아 있는 것만 CSV 에 유지
+            combined_data.extend(recheck_known_posts(menu_idx, {row["link"] for row in combined_data}))
+
+            # DataFrame으로 변환 후 CSV로 저장
+            df = pd.DataFrame(combined_data)
+            os.makedirs(os.path.dirname(csv_path), exist_ok=True)
+            df.to_csv(csv_path, index=False, encoding="utf-8-sig")
+            print(f"결과가 '{csv_path}'에 저장되었습니다.")
+            print(f"OCR 캐시 (menu_idx={menu_idx}): {ocr_stage.stats()}")
+
+            elapsed = time.perf_counter() - started
+            pages = len(links) + list_pages  # 게시물 + 목록 페이지
+            print(f"소요 시간 (menu_idx={menu_idx}): {elapsed:.1f}s, {pages / elapsed:.2f} pages/s")
         except Exception as e:
             print(f"크롤링 중 오류 발생 (menu_idx={menu_idx}): {e}")
 
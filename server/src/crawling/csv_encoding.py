@@ -0,0 +1,15 @@
+import codecs
+
+
+def detect_encoding(path, prefix_size=64 * 1024):
+    """크롤링한 CSV 파일 앞부분만 읽어 utf-8(-sig) / cp949 를 판별"""
+    with open(path, "rb") as f:
+        prefix = f.read(prefix_size)
+    if prefix.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    try:
+        # 잘린 멀티바이트 문자는 무시하고 판별
+        codecs.getincrementaldecoder("utf-8")().decode(prefix, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        return "cp949"
@@ -1,5 +1,8 @@
 import os
+import hashlib
+import argparse
 import pandas as pd
+from csv_encoding import detect_encoding
 
 # 경로 설정
 CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -11,6 +14,7 @@ CSV_PATHS = {
     "promotion": os.path.join(CURRENT_DIR, "../../data/csv/mjc_promotion.csv"),
 }
 MERGED_CSV_PATH = os.path.join(CURRENT_DIR, "../../data/csv/mjc_combined_data.csv")
+REQUIRED_COLUMNS = ["title", "context", "date", "link"]
 
 def check_file_exists(file_path):
     """파일 경로 확인"""
@@ -31,6 +35,79 @@ def merge_csv_files(csv_paths, output_path):
     merged_df.to_csv(output_path, index=False, encoding="utf-8-sig")
     print(f"병합된 CSV 파일이 '{output_path}'에 저장되었습니다.")
 
+def check_schema(path, columns):
+    """필수 컬럼 확인"""
+    missing = [column for column in REQUIRED_COLUMNS if column not in columns]
+    if missing:
+        raise ValueError(f"필수 컬럼이 없습니다 ({', '.join(missing)}): {path}")
+
+def row_key(link, context):
+    """중복 판단 키: link 가 있으면 link, 없으면 본문 해시"""
+    if link:
+        return link
+    return hashlib.sha1(context.encode("utf-8")).hexdigest()
+
+def merge_csv_files_streaming(csv_paths, output_path, chunksize=1000, parquet_path=None):
+    """
+    CSV 파일을 청크 단위로 읽어 병합 (메모리 사용량이 전체 크기와 무관하게 일정).
+    카테고리 간 중복 게시물은 처음 나온 것만 남기고, category 컬럼을 추가한다.
+    """
+    seen = set()
+    header_written = False
+    parquet_writer = None
+    rows_in = rows_out = 0
+
+    try:
+        for category, path in csv_paths.items():
+            check_file_exists(path)
+            encoding = detect_encoding(path)
+            reader = pd.read_csv(path, encoding=encoding, chunksize=chunksize, dtype=str, keep_default_na=False)
+            for chunk in reader:
+                check_schema(path, chunk.columns)
+                rows_in += len(chunk)
+
+                keys = [row_key(link, context) for link, context in zip(chunk["link"], chunk["context"])]
+                keep = []
+                for key in keys:
+                    keep.append(key not in seen)
+                    seen.add(key)
+                chunk = chunk.loc[keep, REQUIRED_COLUMNS].assign(category=category)
+                if chunk.empty:
+                    continue
+                rows_out += len(chunk)
+
+                # 첫 청크만 BOM/헤더를 쓰고 이후에는 이어 쓴다
+                if header_written:
+                    chunk.to_csv(output_path, mode="a", index=False, header=False, encoding="utf-8")
+                else:
+                    chunk.to_csv(output_path, mode="w", index=False, encoding="utf-8-sig")
+                    header_written = True
+
+                if parquet_path:
+                    import pyarrow as pa
+                    import pyarrow.parquet as pq
+
+                    table = pa.Table.from_pandas(chunk, preserve_index=False)
+                    if parquet_writer is None:
+                        parquet_writer = pq.ParquetWriter(parquet_path, table.schema)
+                    parquet_writer.write_table(table)
+    finally:
+        if parquet_writer is not None:
+            parquet_writer.close()
+
+    print(f"병합된 CSV 파일이 '{output_path}'에 저장되었습니다. (입력 {rows_in}행, 중복 제외 {rows_out}행)")
+    if parquet_path:
+        print(f"Parquet 파일이 '{parquet_path}'에 저장되었습니다.")
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="게시판별 CSV 병합")
+    parser.add_argument("--stream", action="store_true", help="청크 단위 스트리밍 병합 (중복 제거, category 컬럼 추가)")
+    parser.add_argument("--chunksize", type=int, default=1000)
+    parser.add_argument("--parquet", help="스트리밍 병합 시 Parquet 파일도 함께 저장할 경로")
+    args = parser.parse_args()
+
     # CSV 파일 병합
-    merge_csv_files(CSV_PATHS, MERGED_CSV_PATH)
+    if args.stream:
+        merge_csv_files_streaming(CSV_PATHS, MERGED_CSV_PATH, chunksize=args.chunksize, parquet_path=args.parquet)
+    else:
+        merge_csv_files(CSV_PATHS, MERGED_CSV_PATH)
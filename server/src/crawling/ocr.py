@@ -0,0 +1,112 @@
+import os
+import json
+import hashlib
+import threading
+import requests
+from concurrent.futures import ThreadPoolExecutor
+
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", 4))
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+OCR_CACHE_DIR = os.getenv("OCR_CACHE_DIR", os.path.join(CURRENT_DIR, "../../data/cache/ocr"))
+# 설정하면 Upstage 대신 이 주소의 OCR 서비스를 사용 (로컬 대체 서비스로 테스트할 때)
+OCR_ENDPOINT = os.getenv("OCR_ENDPOINT")
+
+
+def upstage_backend(img_path):
+    """Upstage Layout Analysis 로 이미지의 페이지별 텍스트를 얻는다."""
+    from langchain_upstage import UpstageLayoutAnalysisLoader
+
+    loader = UpstageLayoutAnalysisLoader(
+        img_path,
+        output_type="text",
+        split="page",
+        use_ocr=True,
+        exclude=["header", "footer"],
+    )
+    return [str(doc) for doc in loader.load()]
+
+
+def http_backend(endpoint):
+    """
+    이미지를 multipart 로 POST 하고 {"pages": [...]} 또는 {"text": "..."} JSON 을 받는 OCR 서비스.
+    """
+    session = requests.Session()
+
+    def backend(img_path):
+        with open(img_path, "rb") as f:
+            response = session.post(endpoint, files={"document": f}, timeout=60)
+        response.raise_for_status()
+        data = response.json()
+        return data["pages"] if "pages" in data else [data.get("text", "")]
+
+    return backend
+
+
+class OCRStage:
+    """
+    크롤링과 겹쳐서 실행되는 OCR 단계.
+    작업 큐에 이미지를 넣으면 제한된 수의 워커가 처리하고, 결과는 이미지 바이트 해시로 디스크에 캐시된다.
+    """
+
+    def __init__(self, backend=None, cache_dir=OCR_CACHE_DIR, workers=OCR_WORKERS):
+        self.backend = backend or (http_backend(OCR_ENDPOINT) if OCR_ENDPOINT else upstage_backend)
+        self.cache_dir = cache_dir
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+        self._lock = threading.Lock()
+        self._in_flight = {}  # 같은 이미지가 동시에 들어오면 한 번만 처리
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _cache_path(self, digest):
+        return os.path.join(self.cache_dir, digest[:2], f"{digest}.json")
+
+    def _read_cache(self, digest):
+        try:
+            with open(self._cache_path(digest), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _write_cache(self, digest, pages):
+        path = self._cache_path(digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(pages, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def _run(self, img_path, digest):
+        try:
+            pages = self._read_cache(digest)
+            if pages is not None:
+                with self._lock:
+                    self.hits += 1
+                return pages
+            with self._lock:
+                self.misses += 1
+            pages = self.backend(img_path)
+            self._write_cache(digest, pages)
+            return pages
+        finally:
+            with self._lock:
+                self._in_flight.pop(digest, None)
+
+    def submit(self, img_path):
+        """이미지 OCR 작업을 큐에 넣고, 페이지별 텍스트 목록을 돌려줄 Future 를 반환"""
+        with open(img_path, "rb") as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        with self._lock:
+            future = self._in_flight.get(digest)
+            if future is None:
+                future = self._executor.submit(self._run, img_path, digest)
+                self._in_flight[digest] = future
+            return future
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / total if total else 0.0}
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
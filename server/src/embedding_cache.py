@@ -0,0 +1,144 @@
+import os
+import asyncio
+import hashlib
+import sqlite3
+import threading
+import logging
+from array import array
+from langchain_core.embeddings import Embeddings
+from langchain_openai.embeddings import OpenAIEmbeddings
+
+# 실행 위치(server/, src/, src/lecture/ ...)와 관계없이 같은 캐시 파일을 사용
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+EMBEDDING_CACHE_PATH = os.getenv(
+    "EMBEDDING_CACHE_PATH",
+    os.path.join(CURRENT_DIR, "../data/cache/embeddings.sqlite3")
+)
+
+# SQLite 변수 개수 제한에 걸리지 않도록 조회를 나눈다
+LOOKUP_BATCH = 500
+
+
+class EmbeddingStore:
+    """(모델, 텍스트 해시) -> float32 벡터를 저장하는 SQLite 파일"""
+
+    def __init__(self, path=EMBEDDING_CACHE_PATH):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key BLOB PRIMARY KEY, vector BLOB NOT NULL)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def key(model, text):
+        return hashlib.sha256(f"{model}\x00{text}".encode("utf-8")).digest()
+
+    def get_many(self, keys):
+        found = {}
+        with self._lock:
+            for start in range(0, len(keys), LOOKUP_BATCH):
+                batch = keys[start:start + LOOKUP_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+                )
+                for key, blob in rows:
+                    vector = array("f")
+                    vector.frombytes(blob)
+                    found[key] = vector.tolist()
+        return found
+
+    def put_many(self, items):
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                [(key, array("f", vector).tobytes()) for key, vector in items]
+            )
+            self._conn.commit()
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    임베딩 결과를 디스크에 캐시하는 래퍼.
+    같은 모델과 텍스트는 다시 API 를 호출하지 않으며, 캐시에 없는 텍스트만 한 번에 모아 임베딩한다.
+    """
+
+    def __init__(self, underlying, model, store=None):
+        self.underlying = underlying
+        self.model = model
+        self.store = store or EmbeddingStore()
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0  # 캐시 덕분에 API 로 보내지 않은 텍스트 바이트 수
+
+    def _lookup(self, texts):
+        keys = [self.store.key(self.model, text) for text in texts]
+        found = self.store.get_many(list(set(keys)))
+        # 캐시에 없는 텍스트는 중복을 제거해 한 번만 임베딩
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in missing:
+                missing[key] = text
+        with self._stats_lock:
+            hit_texts = [text for key, text in zip(keys, texts) if key in found]
+            self.hits += len(hit_texts)
+            self.misses += len(texts) - len(hit_texts)
+            self.bytes_saved += sum(len(text.encode("utf-8")) for text in hit_texts)
+        return keys, found, missing
+
+    def _merge(self, keys, found, missing, vectors):
+        new_items = list(zip(missing.keys(), vectors))
+        if new_items:
+            self.store.put_many(new_items)
+            found.update(new_items)
+        return [found[key] for key in keys]
+
+    def embed_documents(self, texts):
+        keys, found, missing = self._lookup(texts)
+        vectors = self.underlying.embed_documents(list(missing.values())) if missing else []
+        return self._merge(keys, found, missing, vectors)
+
+    def embed_query(self, text):
+        keys, found, missing = self._lookup([text])
+        vectors = [self.underlying.embed_query(text)] if missing else []
+        return self._merge(keys, found, missing, vectors)[0]
+
+    async def aembed_documents(self, texts):
+        keys, found, missing = await asyncio.to_thread(self._lookup, texts)
+        vectors = await self.underlying.aembed_documents(list(missing.values())) if missing else []
+        return await asyncio.to_thread(self._merge, keys, found, missing, vectors)
+
+    async def aembed_query(self, text):
+        keys, found, missing = await asyncio.to_thread(self._lookup, [text])
+        vectors = [await self.underlying.aembed_query(text)] if missing else []
+        return (await asyncio.to_thread(self._merge, keys, found, missing, vectors))[0]
+
+    def stats(self):
+        with self._stats_lock:
+            total = self.hits + self.misses
+            return {
+                "model": self.model,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "bytes_saved": self.bytes_saved,
+            }
+
+    def log_stats(self):
+        logging.info(f"임베딩 캐시: {self.stats()}")
+
+
+_instances = {}
+_instances_lock = threading.Lock()
+
+
+def get_embeddings(model="text-embedding-3-small"):
+    """프로젝트 전체에서 사용하는 캐시된 OpenAI 임베딩 (모델별로 프로세스당 하나)"""
+    with _instances_lock:
+        if model not in _instances:
+            _instances[model] = CachedEmbeddings(OpenAIEmbeddings(model=model), model)
+        return _instances[model]
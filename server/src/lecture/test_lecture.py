@@ -1,7 +1,7 @@
 import os
+import sys
 from dotenv import load_dotenv
 from langchain_chroma import Chroma
-from langchain_openai.embeddings import OpenAIEmbeddings
 from langchain.prompts import ChatPromptTemplate
 from langchain.chat_models import ChatOpenAI
 from langchain.chains import RetrievalQA
@@ -9,6 +9,9 @@ from langchain.chains import RetrievalQA
 # 환경변수 로드
 load_dotenv()
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from embedding_cache import get_embeddings
+
 # 강의 요약 실행 함수
 def summarize_lecture(db, query):
     """강의 요약을 수행하는 함수"""
@@ -78,7 +81,7 @@ if __name__ == "__main__":
             print(f"Loading existing collection: {COLLECTION_NAME}")
             db = Chroma(
                 persist_directory=DB_PATH,
-                embedding_function=OpenAIEmbeddings(model="text-embedding-3-small"),
+                embedding_function=get_embeddings("text-embedding-3-small"),
                 collection_name=COLLECTION_NAME
             )
             print("Database loaded successfully.")
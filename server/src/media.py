@@ -0,0 +1,43 @@
+import os
+import glob
+import subprocess
+
+# 음성 인식에는 16kHz 모노 PCM 이면 충분하다 (44.1kHz 스테레오 대비 1/5.5 크기)
+STT_SAMPLE_RATE = 16000
+STT_CHANNELS = 1
+
+
+def download_audio(video_url, output_dir, name):
+    """
+    yt-dlp 로 오디오 스트림만 내려받는다 (오디오 전용 포맷이 없으면 전체 영상).
+    반환값: 내려받은 파일 경로 (확장자는 포맷에 따라 webm/m4a/opus 등)
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    output_template = os.path.join(output_dir, f"{name}.%(ext)s")
+    subprocess.run(
+        ["yt-dlp", "-f", "bestaudio/best", "--no-playlist", "-o", output_template, video_url],
+        check=True
+    )
+    downloaded = [path for path in glob.glob(os.path.join(output_dir, f"{name}.*")) if not path.endswith(".part")]
+    if not downloaded:
+        raise ValueError("Downloaded audio file not found.")
+    return downloaded[0]
+
+
+def extract_audio(input_path, output_path, sample_rate=STT_SAMPLE_RATE, channels=STT_CHANNELS):
+    """
+    영상/오디오 파일에서 음성 트랙만 한 번에 디코딩해 16kHz 모노 WAV 로 저장한다.
+    (중간 mp4 재인코딩 없이 ffmpeg 한 번)
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    subprocess.run([
+        "ffmpeg", "-nostdin", "-y", "-loglevel", "error",
+        "-i", input_path,
+        "-map", "0:a:0",  # 첫 번째 오디오 스트림만 읽는다
+        "-vn", "-sn", "-dn",
+        "-ac", str(channels),
+        "-ar", str(sample_rate),
+        "-c:a", "pcm_s16le",
+        output_path
+    ], check=True)
+    return output_path
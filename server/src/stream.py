@@ -1,10 +1,10 @@
 import asyncio
 from dotenv import load_dotenv
-from langchain_openai.embeddings import OpenAIEmbeddings
 from langchain_chroma import Chroma
 from langchain.chat_models import ChatOpenAI
 from langchain.prompts import PromptTemplate
 import os
+from embedding_cache import get_embeddings
 
 # 환경변수 로드
 load_dotenv()
@@ -12,7 +12,7 @@ load_dotenv()
 # ChromaDB 초기화
 db = Chroma(
     persist_directory="../chroma_db/combinded",
-    embedding_function=OpenAIEmbeddings(model="text-embedding-3-small"),
+    embedding_function=get_embeddings("text-embedding-3-small"),
     collection_name="combinded"
 )
 
@@ -49,7 +49,7 @@ async def generate_stream(query):
     """
     try:
         # 문서 검색
-        documents = retriever.invoke(query)
+        documents = await retriever.ainvoke(query)
         if not documents:
             yield "data: No relevant documents found.\n\n"
             return
@@ -60,9 +60,8 @@ async def generate_stream(query):
         # Prompt 실행 및 스트림 반환
         inputs = prompt_template.format(context=context, question=query)
 
-        # 비동기 스트림 처리
-        loop = asyncio.get_event_loop()
-        for chunk in await loop.run_in_executor(None, llm.stream, inputs):  # 동기 -> 비동기 변환
+        # 비동기 스트림 처리 (토큰이 생성되는 대로 전달)
+        async for chunk in llm.astream(inputs):
             # AIMessageChunk의 content 속성 사용
             if hasattr(chunk, 'content') and chunk.content:
                 yield f"data: {chunk.content}\n\n"
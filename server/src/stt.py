@@ -0,0 +1,180 @@
+import io
+import os
+import json
+import time
+import wave
+import random
+import logging
+import requests
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+# 긴 강의는 구간으로 나눠 동시에 인식한다
+STT_SEGMENT_SECONDS = float(os.getenv("STT_SEGMENT_SECONDS", 300))
+STT_OVERLAP_SECONDS = float(os.getenv("STT_OVERLAP_SECONDS", 2))
+# 구간 끝 이 범위 안에서 가장 조용한 지점을 자르는 위치로 고른다
+STT_SILENCE_SEARCH_SECONDS = float(os.getenv("STT_SILENCE_SEARCH_SECONDS", 10))
+STT_CONCURRENCY = int(os.getenv("STT_CONCURRENCY", 4))
+STT_MAX_RETRIES = int(os.getenv("STT_MAX_RETRIES", 3))
+
+FRAME_SECONDS = 0.02  # 무음 탐색 단위 (20ms)
+
+
+def read_wav(path):
+    """16bit PCM WAV 를 (샘플 배열[frames, channels], 샘플레이트) 로 읽는다."""
+    with wave.open(path, "rb") as f:
+        if f.getsampwidth() != 2:
+            raise ValueError("16-bit PCM WAV only")
+        rate = f.getframerate()
+        channels = f.getnchannels()
+        samples = np.frombuffer(f.readframes(f.getnframes()), dtype=np.int16).reshape(-1, channels)
+    return samples, rate
+
+
+def wav_bytes(samples, rate):
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as f:
+        f.setnchannels(samples.shape[1])
+        f.setsampwidth(2)
+        f.setframerate(rate)
+        f.writeframes(samples.tobytes())
+    return buffer.getvalue()
+
+
+def quietest_point(samples, start, end, rate):
+    """[start, end) 구간에서 20ms 프레임 에너지가 가장 낮은 지점"""
+    frame = max(1, int(rate * FRAME_SECONDS))
+    count = (end - start) // frame
+    if count < 1:
+        return end
+    mono = samples[start:start + count * frame].astype(np.float32).mean(axis=1)
+    energy = np.square(mono.reshape(count, frame)).mean(axis=1)
+    return start + int(np.argmin(energy)) * frame + frame // 2
+
+
+def plan_segments(samples, rate, segment_seconds=STT_SEGMENT_SECONDS, overlap_seconds=STT_OVERLAP_SECONDS,
+                  search_seconds=STT_SILENCE_SEARCH_SECONDS):
+    """
+    오디오를 segment_seconds 안팎의 구간으로 나눈다. 자르는 위치는 구간 끝 근처의 무음 지점.
+    반환값: [(audio_start, audio_end, core_start, core_end)] (샘플 단위)
+    core 는 겹치지 않는 담당 구간이고, audio 는 앞뒤로 overlap 을 붙인 실제 전송 구간이다.
+    """
+    total = len(samples)
+    length = int(segment_seconds * rate)
+    overlap = int(overlap_seconds * rate)
+    cuts = [0]
+    while total - cuts[-1] > length:
+        target = cuts[-1] + length
+        search_start = max(cuts[-1] + length // 2, target - int(search_seconds * rate))
+        cuts.append(quietest_point(samples, search_start, target, rate))
+    cuts.append(total)
+    return [
+        (max(0, core_start - overlap), min(total, core_end + overlap), core_start, core_end)
+        for core_start, core_end in zip(cuts, cuts[1:])
+    ]
+
+
+class STTError(Exception):
+    """CLOVA 가 응답은 했지만 인식 결과가 COMPLETED 가 아닌 경우"""
+
+
+def retryable(error):
+    """5xx, 429, 네트워크 오류만 다시 시도한다 (인증 실패/잘못된 파라미터 등 4xx 와 인식 실패는 바로 실패)"""
+    if isinstance(error, requests.HTTPError):
+        status = error.response.status_code if error.response is not None else None
+        return status is not None and (status == 429 or status >= 500)
+    return isinstance(error, (requests.ConnectionError, requests.Timeout))
+
+
+def clova_request(session, api_url, api_key, media, name):
+    headers = {'X-CLOVASPEECH-API-KEY': api_key}
+    params = {
+        "language": "ko-KR",
+        "completion": "sync",
+        "callback": "",
+        "fullText": True
+    }
+    data = {'params': json.dumps(params), 'type': "application/json"}
+    response = session.post(api_url, headers=headers, files={'media': (name, media, 'audio/wav')}, data=data, timeout=600)
+    response.raise_for_status()
+    result = response.json()
+    if result.get("result") != "COMPLETED":
+        raise STTError(f"{result.get('result')}: {result.get('message')}")
+    return result
+
+
+def transcribe_with_retry(request, max_retries=STT_MAX_RETRIES, backoff=1.0):
+    for attempt in range(max_retries + 1):
+        try:
+            return request()
+        except Exception as e:
+            if attempt == max_retries or not retryable(e):
+                raise
+            delay = backoff * (2 ** attempt) + random.uniform(0, backoff)
+            logging.warning(f"음성 인식 실패 ({e}), {delay:.1f}초 후 재시도 ({attempt + 1}/{max_retries})")
+            time.sleep(delay)
+
+
+def merge_overlap(previous_words, next_words, max_words):
+    """앞 구간 끝과 다음 구간 시작에서 겹치는 가장 긴 단어열을 찾아 다음 구간에서 제거"""
+    for size in range(min(max_words, len(previous_words), len(next_words)), 0, -1):
+        if previous_words[-size:] == next_words[:size]:
+            return next_words[size:]
+    return next_words
+
+
+def stitch(results, segments, rate, overlap_seconds):
+    """
+    구간별 인식 결과를 하나로 합친다.
+    - 모든 결과에 타임스탬프(segments)가 있으면 중간 시각이 core 구간에 속하는 문장만 남긴다.
+    - 없으면 겹치는 구간의 단어열을 비교해 중복을 제거한다.
+    반환값: {"text": 전체 텍스트, "segments": [{"start", "end", "text"}] (ms, 원본 기준)}
+    """
+    if all(result.get("segments") for result in results):
+        merged = []
+        for result, (audio_start, _, core_start, core_end) in zip(results, segments):
+            offset = audio_start * 1000 // rate
+            for segment in result["segments"]:
+                start, end = segment["start"] + offset, segment["end"] + offset
+                middle = (start + end) / 2
+                if core_start * 1000 / rate <= middle < core_end * 1000 / rate:
+                    merged.append({"start": start, "end": end, "text": segment["text"]})
+        return {"text": " ".join(segment["text"] for segment in merged), "segments": merged}
+
+    # 한국어 발화 속도(초당 3~4 어절)를 넉넉히 잡은 겹침 구간 최대 단어 수
+    max_words = int(overlap_seconds * 2 * 6) + 1
+    words, merged = [], []
+    for result, (_, _, core_start, core_end) in zip(results, segments):
+        segment_words = merge_overlap(words, result.get("text", "").split(), max_words)
+        words.extend(segment_words)
+        merged.append({
+            "start": core_start * 1000 // rate,
+            "end": core_end * 1000 // rate,
+            "text": " ".join(segment_words),
+        })
+    return {"text": " ".join(words), "segments": merged}
+
+
+def transcribe_long_audio(wav_path, api_url, api_key, segment_seconds=STT_SEGMENT_SECONDS,
+                          overlap_seconds=STT_OVERLAP_SECONDS, concurrency=STT_CONCURRENCY,
+                          max_retries=STT_MAX_RETRIES):
+    """
+    WAV 를 무음 지점 기준으로 나눠 CLOVA Speech 에 동시에 보내고 결과를 합친다.
+    구간마다 재시도하므로 한 구간이 실패해도 전체를 다시 인식하지 않는다.
+    """
+    samples, rate = read_wav(wav_path)
+    segments = plan_segments(samples, rate, segment_seconds, overlap_seconds)
+    session = requests.Session()
+
+    def transcribe(index):
+        audio_start, audio_end, _, _ = segments[index]
+        media = wav_bytes(samples[audio_start:audio_end], rate)
+        return transcribe_with_retry(
+            lambda: clova_request(session, api_url, api_key, media, f"segment_{index}.wav"), max_retries
+        )
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(transcribe, range(len(segments))))
+    logging.info(f"음성 인식: {len(segments)}개 구간, {time.perf_counter() - started:.1f}초")
+    return stitch(results, segments, rate, overlap_seconds)
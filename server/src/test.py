@@ -1,6 +1,5 @@
 from dotenv import load_dotenv
 from langchain_community.document_loaders.csv_loader import CSVLoader
-from langchain_openai.embeddings import OpenAIEmbeddings
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_chroma import Chroma
 from langchain import hub
@@ -9,6 +8,7 @@ from langchain.schema import Document
 from langchain_core.runnables import RunnablePassthrough
 from langchain_core.output_parsers import StrOutputParser
 import os
+from embedding_cache import get_embeddings
 
 # 환경변수 로드
 load_dotenv()
@@ -29,7 +29,7 @@ load_dotenv()
 
 db = Chroma(
             persist_directory="../chroma_db/combinded",
-            embedding_function=OpenAIEmbeddings(model="text-embedding-3-small"),
+            embedding_function=get_embeddings("text-embedding-3-small"),
             collection_name="combinded"
         )
 
@@ -3,7 +3,7 @@ from moviepy.editor import VideoFileClip
 import requests
 from dotenv import load_dotenv
 from langchain_chroma import Chroma
-from langchain_openai.embeddings import OpenAIEmbeddings
+from embedding_cache import get_embeddings
 from langchain import hub
 from langchain.chat_models import ChatOpenAI
 from langchain_core.runnables import RunnablePassthrough
@@ -66,7 +66,7 @@ def create_chain():
     # ChromaDB 설정
     db = Chroma(
         persist_directory=os.path.join(CHROMA_DB_DIR, "lecture_db"),
-        embedding_function=OpenAIEmbeddings(model="text-embedding-ada-002"),
+        embedding_function=get_embeddings("text-embedding-ada-002"),
         collection_name="lecture_data"
     )
 
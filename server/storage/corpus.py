@@ -0,0 +1,106 @@
+import os
+import csv
+import sys
+import sqlite3
+import threading
+from django.conf import settings
+from src.crawling.csv_encoding import detect_encoding
+
+# 크롤링한 게시판별 CSV
+CORPUS_CSVS = {
+    "notice": "data/csv/mjc_notice.csv",
+    "academic": "data/csv/mjc_academic.csv",
+    "scholarship": "data/csv/mjc_scholarship.csv",
+    "recruitment": "data/csv/mjc_recruitment.csv",
+    "promotion": "data/csv/mjc_promotion.csv",
+}
+CORPUS_DB = os.getenv("CORPUS_DB", os.path.join(settings.BASE_DIR, "data/cache/corpus.sqlite3"))
+COLUMNS = ["title", "context", "date", "link", "category"]
+
+csv.field_size_limit(sys.maxsize)
+
+_lock = threading.Lock()
+
+
+def _connect():
+    os.makedirs(os.path.dirname(CORPUS_DB), exist_ok=True)
+    conn = sqlite3.connect(CORPUS_DB, timeout=30)
+    conn.executescript("""
+        PRAGMA journal_mode=WAL;
+        CREATE TABLE IF NOT EXISTS sources (category TEXT PRIMARY KEY, mtime_ns INTEGER);
+        CREATE TABLE IF NOT EXISTS posts (
+            id INTEGER PRIMARY KEY,
+            category TEXT NOT NULL,
+            title TEXT,
+            context TEXT,
+            date TEXT,
+            link TEXT
+        );
+        CREATE INDEX IF NOT EXISTS posts_category_date ON posts (category, date);
+        CREATE INDEX IF NOT EXISTS posts_date ON posts (date);
+    """)
+    return conn
+
+
+def source_mtimes():
+    mtimes = {}
+    for category, relative_path in CORPUS_CSVS.items():
+        path = os.path.join(settings.BASE_DIR, relative_path)
+        if os.path.exists(path):
+            mtimes[category] = os.stat(path).st_mtime_ns
+    return mtimes
+
+
+def refresh():
+    """
+    CSV 수정 시각이 바뀐 카테고리만 SQLite 로 다시 적재한다.
+    반환값(카테고리별 수정 시각)은 응답 캐시 키로 사용한다.
+    """
+    mtimes = source_mtimes()
+    with _lock:
+        conn = _connect()
+        try:
+            indexed = dict(conn.execute("SELECT category, mtime_ns FROM sources"))
+            for category, mtime_ns in mtimes.items():
+                if indexed.get(category) == mtime_ns:
+                    continue
+                path = os.path.join(settings.BASE_DIR, CORPUS_CSVS[category])
+                with conn, open(path, "r", encoding=detect_encoding(path), newline="") as f:
+                    conn.execute("DELETE FROM posts WHERE category = ?", (category,))
+                    conn.executemany(
+                        "INSERT INTO posts (category, title, context, date, link) VALUES (?, ?, ?, ?, ?)",
+                        ((category, row.get("title"), row.get("context"), row.get("date"), row.get("link"))
+                         for row in csv.DictReader(f))
+                    )
+                    conn.execute("INSERT OR REPLACE INTO sources (category, mtime_ns) VALUES (?, ?)", (category, mtime_ns))
+        finally:
+            conn.close()
+    return mtimes
+
+
+def query(columns=None, category=None, date_from=None, date_to=None, offset=0, limit=100):
+    """조건에 맞는 게시물 중 offset 부터 limit 개와 전체 개수를 반환"""
+    columns = columns or COLUMNS
+    where, params = [], []
+    if category:
+        where.append("category = ?")
+        params.append(category)
+    if date_from:
+        where.append("date >= ?")
+        params.append(date_from)
+    if date_to:
+        where.append("date <= ?")
+        params.append(date_to)
+    where_sql = f"WHERE {' AND '.join(where)}" if where else ""
+
+    conn = _connect()
+    try:
+        total = conn.execute(f"SELECT COUNT(*) FROM posts {where_sql}", params).fetchone()[0]
+        # columns 는 COLUMNS 안의 값만 허용되므로 그대로 SQL 에 넣어도 안전
+        rows = conn.execute(
+            f"SELECT {', '.join(columns)} FROM posts {where_sql} ORDER BY id LIMIT ? OFFSET ?",
+            params + [limit, offset]
+        ).fetchall()
+    finally:
+        conn.close()
+    return [list(row) for row in rows], total
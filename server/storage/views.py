@@ -1,26 +1,66 @@
-import csv
+from django.core.cache import cache
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
-from django.conf import settings
+from . import corpus
 import requests
-import os
+import hashlib
 import json
 
+CSV_CACHE_TIMEOUT = 300
+MAX_LIMIT = 1000
+
+
 @csrf_exempt
 def read_csv(request):
+    """
+    크롤링한 게시물을 페이지 단위로 조회.
+    ?offset=&limit=&category=(기본 promotion, all 이면 전체)&date_from=&date_to=&columns=title,date
+    """
     if request.method == 'GET':
-        csv_path = os.path.join(settings.BASE_DIR, 'data/csv/mjc_promotion.csv')
-        
-        if not os.path.exists(csv_path):
-            return JsonResponse({'error': 'CSV file not found'}, status=404)
+        try:
+            offset = int(request.GET.get('offset', 0))
+            limit = min(int(request.GET.get('limit', 100)), MAX_LIMIT)
+        except ValueError:
+            return JsonResponse({'error': 'offset and limit must be integers'}, status=400)
+        if offset < 0 or limit < 1:
+            return JsonResponse({'error': 'Invalid offset or limit'}, status=400)
+
+        category = request.GET.get('category', 'promotion')
+        if category == 'all':
+            category = None
+        elif category not in corpus.CORPUS_CSVS:
+            return JsonResponse({'error': f'Unknown category: {category}'}, status=400)
+
+        columns = [c for c in request.GET.get('columns', '').split(',') if c] or corpus.COLUMNS[:4]
+        invalid = [c for c in columns if c not in corpus.COLUMNS]
+        if invalid:
+            return JsonResponse({'error': f"Unknown columns: {', '.join(invalid)}"}, status=400)
+
+        date_from = request.GET.get('date_from')
+        date_to = request.GET.get('date_to')
 
         try:
-            with open(csv_path, 'r', encoding='utf-8') as csvfile:
-                reader = csv.reader(csvfile)
-                csv_data = [row for row in reader]
+            # CSV 가 바뀐 경우에만 다시 적재하고, 응답은 파일 수정 시각별로 캐시
+            mtimes = corpus.refresh()
+            if category and category not in mtimes:
+                return JsonResponse({'error': 'CSV file not found'}, status=404)
+
+            cache_key = "storage:read_csv:" + hashlib.sha256(json.dumps(
+                [sorted(mtimes.items()), offset, limit, category, columns, date_from, date_to]
+            ).encode('utf-8')).hexdigest()
+            payload = cache.get(cache_key)
+            if payload is None:
+                rows, total = corpus.query(columns, category, date_from, date_to, offset, limit)
+                payload = {
+                    'data': [columns] + rows,  # 첫 행은 헤더 (기존 응답 형식 유지)
+                    'total': total,
+                    'offset': offset,
+                    'limit': limit,
+                    'message': 'CSV file read successfully',
+                }
+                cache.set(cache_key, payload, timeout=CSV_CACHE_TIMEOUT)
 
-            # 데이터를 JSON으로 변환
-            return JsonResponse({'data': csv_data, 'message': 'CSV file read successfully'}, json_dumps_params={'ensure_ascii': False})
+            return JsonResponse(payload, json_dumps_params={'ensure_ascii': False})
         except UnicodeDecodeError:
             return JsonResponse({'error': 'Failed to decode file. Check file encoding.'}, status=500)
         except Exception as e: